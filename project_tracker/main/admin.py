@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Category, Status, Project
+from .models import Category, CategoryScore, Status, Project
 
 # Register your models here.
 admin.site.register(Category)
 admin.site.register(Status)
-admin.site.register(Project)
\ No newline at end of file
+admin.site.register(Project)
+admin.site.register(CategoryScore)
\ No newline at end of file
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class MainConfig(AppConfig):
     name = 'main'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import signals  # noqa: F401
+        from .metrics import install_sql_timer
+        from .sqlite import apply_pragmas
+        connection_created.connect(apply_pragmas, dispatch_uid='main.sqlite.apply_pragmas')
+        connection_created.connect(install_sql_timer, dispatch_uid='main.metrics.install_sql_timer')
@@ -0,0 +1,84 @@
+"""
+ASGI routing for the Server-Sent Events stream.
+
+EVENTS_PATH is answered here, in front of Django's ASGIHandler. Inside the
+handler every request gets its own thread-sensitive context, and the sync
+middleware stack pins a worker thread to it until the response finishes,
+which for a stream means as long as the tab stays open. Served here, an
+open stream is just a suspended coroutine plus a queue (main.events).
+The session and user are still checked, through Django's async APIs.
+"""
+import asyncio
+import io
+from importlib import import_module
+from django.conf import settings
+from django.contrib.auth import aget_user
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from . import events
+
+EVENTS_PATH = '/projects/events'
+
+
+async def _send_plain(send, status, text):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+    await send({'type': 'http.response.body', 'body': text.encode()})
+
+
+async def _authenticated(scope):
+    request = ASGIRequest(scope, io.BytesIO())
+    request.get_host()  # ALLOWED_HOSTS, as CommonMiddleware would check
+    engine = import_module(settings.SESSION_ENGINE)
+    request.session = engine.SessionStore(request.COOKIES.get(settings.SESSION_COOKIE_NAME))
+    user = await aget_user(request)
+    return user.is_authenticated
+
+
+async def event_stream(scope, receive, send):
+    """Serve one SSE connection until the client disconnects."""
+    message = await receive()
+    if message['type'] == 'http.disconnect':
+        return
+    if scope['method'] != 'GET':
+        return await _send_plain(send, 405, 'Method not allowed')
+    try:
+        if not await _authenticated(scope):
+            return await _send_plain(send, 403, 'Login required')
+    except DisallowedHost:
+        return await _send_plain(send, 400, 'Bad host')
+
+    backend = events.get_backend()
+    queue = backend.subscribe()
+
+    async def pump():
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # Stop reverse proxies from buffering the stream
+            (b'x-accel-buffering', b'no'),
+        ]})
+        async for frame in events.stream(queue):
+            await send({'type': 'http.response.body', 'body': frame.encode(), 'more_body': True})
+
+    sender = asyncio.create_task(pump())
+    try:
+        while not sender.done():
+            receiver = asyncio.ensure_future(receive())
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver.done() and receiver.result()['type'] == 'http.disconnect':
+                break
+            receiver.cancel()
+    finally:
+        backend.unsubscribe(queue)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+
+
+def with_event_stream(django_application):
+    """Wrap the Django ASGI application so EVENTS_PATH is served by event_stream."""
+    async def application(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+            return await event_stream(scope, receive, send)
+        return await django_application(scope, receive, send)
+    return application
@@ -0,0 +1,129 @@
+"""
+Bulk create/update of projects.
+
+Categories referenced by a batch are resolved with one in_bulk() call, and
+statuses and owners from the reference registry (main.reference); the writes go through bulk_create/bulk_update inside a single
+transaction, so the number of queries does not grow with the batch size.
+"""
+from decimal import Decimal
+from typing import Annotated
+from uuid import UUID
+from django.db import transaction
+from django.utils import timezone
+from pydantic import BeforeValidator
+from .models import Category, Project
+from .reference import get_reference
+from .payloads import Id, PayloadError, ProjectCreate, ProjectUpdate, validate, blank_to_none
+from .signals import projects_bulk_saved
+
+SCALAR_FIELDS = ('project_name', 'project_phase', 'stretch_target_date', 'budget', 'measure_initiative_weight')
+UPDATABLE_FIELDS = SCALAR_FIELDS + ('comment', 'category', 'project_status', 'owner')
+FK_KEYS = {'category_id': 'category', 'project_status_id': 'project_status', 'owner_id': 'owner'}
+
+
+class BulkProjectCreate(ProjectCreate):
+    category_id: Annotated[UUID, BeforeValidator(blank_to_none)]
+
+
+class BulkProjectUpdate(ProjectUpdate):
+    uid: Annotated[UUID, BeforeValidator(blank_to_none)]
+    category_id: Id = None
+
+
+class RowError(Exception):
+    pass
+
+
+def _validate_rows(rows, schema):
+    validated = []
+    for row in rows:
+        try:
+            if not isinstance(row, dict):
+                raise PayloadError('Row must be an object')
+            validated.append(validate(schema, row))
+        except PayloadError as e:
+            validated.append(e)
+    return validated
+
+
+def apply_bulk(creates, updates):
+    """
+    Apply a list of project creates and partial updates.
+
+    Returns one result dict per input row, creates first then updates. Rows
+    that fail validation are reported and skipped; the valid rows are written
+    together in one transaction.
+    """
+    creates = _validate_rows(creates, BulkProjectCreate)
+    updates = _validate_rows(updates, BulkProjectUpdate)
+    payloads = [p for p in creates + updates if not isinstance(p, Exception)]
+
+    reference = get_reference()
+    lookups = {
+        'category_id': Category.objects.in_bulk({p.category_id for p in payloads if p.category_id}),
+        'project_status_id': reference.statuses_for({p.project_status_id for p in payloads if p.project_status_id}),
+        'owner_id': reference.owners_for({p.owner_id for p in payloads if p.owner_id}),
+    }
+    existing = Project.objects.in_bulk({p.uid for p in updates if not isinstance(p, Exception)})
+
+    def values_for(payload):
+        values = {f: getattr(payload, f) for f in SCALAR_FIELDS if getattr(payload, f) is not None}
+        if payload.comment is not None:
+            values['comment'] = payload.comment
+        for key, field in FK_KEYS.items():
+            ref = getattr(payload, key)
+            if ref:
+                obj = lookups[key].get(ref)
+                if obj is None:
+                    raise RowError(f'{field.replace("_", " ").capitalize()} not found')
+                values[field] = obj
+        return values
+
+    results = []
+    to_create = []
+    for index, payload in enumerate(creates):
+        try:
+            if isinstance(payload, Exception):
+                raise RowError(str(payload))
+            values = values_for(payload)
+            values.setdefault('budget', Decimal('0.0'))
+            values.setdefault('measure_initiative_weight', Decimal('0.0'))
+            project = Project(**values)
+            to_create.append(project)
+            results.append({'index': index, 'op': 'create', 'ok': True, 'uid': str(project.uid)})
+        except RowError as e:
+            results.append({'index': index, 'op': 'create', 'ok': False, 'error': str(e)})
+
+    to_update = {}
+    changed_fields = set()
+    for index, payload in enumerate(updates):
+        try:
+            if isinstance(payload, Exception):
+                raise RowError(str(payload))
+            project = existing.get(payload.uid)
+            if project is None:
+                raise RowError('Project not found')
+            values = values_for(payload)
+            for field, value in values.items():
+                setattr(project, field, value)
+            changed_fields.update(values)
+            to_update[project.uid] = project
+            results.append({'index': index, 'op': 'update', 'ok': True, 'uid': str(project.uid)})
+        except RowError as e:
+            results.append({'index': index, 'op': 'update', 'ok': False, 'error': str(e)})
+
+    with transaction.atomic():
+        if to_create:
+            Project.objects.bulk_create(to_create)
+        if to_update and changed_fields:
+            # bulk_update bypasses auto_now, so stamp updated_at explicitly, once the write lock is held
+            now = timezone.now()
+            for project in to_update.values():
+                project.updated_at = now
+            fields = [f for f in UPDATABLE_FIELDS if f in changed_fields] + ['updated_at']
+            Project.objects.bulk_update(list(to_update.values()), fields)
+        saved = to_create + list(to_update.values())
+        if saved:
+            # bulk_create/bulk_update send no post_save; notify listeners once per batch
+            transaction.on_commit(lambda: projects_bulk_saved.send(sender=Project, projects=saved))
+    return results
@@ -0,0 +1,115 @@
+"""
+Versioned cache for dashboard payloads.
+
+Every key embeds the current data version. Saving or deleting a Category,
+Status or User bumps the global version, and saving or deleting a Project
+bumps only the version of its category's scope (see main.signals). Entries
+built from older data are never read again and age out through the
+backend's TTL and MAX_ENTRIES culling.
+
+Versions only invalidate across worker processes if the backend is shared
+between them, which is why DASHBOARD_CACHE_BACKEND defaults to 'file'.
+Bumps run after the surrounding transaction commits, so a payload built
+from the old rows cannot be stored under the new version.
+
+Hit and miss counts are kept in memory, per process like main.metrics, so
+a cache hit costs no writes to the backend.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'dashboard:version'
+MAX_VERSIONS_LENGTH = 64
+
+_counts = {'hits': 0, 'misses': 0}
+_counts_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[settings.DASHBOARD_CACHE_ALIAS]
+
+
+def _new_version():
+    # Unique rather than incremented: the file backend's incr() is a
+    # read-then-write, so two processes bumping at once could both write the
+    # same number. The clock prefix keeps a culled key from reusing an old version.
+    return f'{int(time.time() * 1000):x}{uuid.uuid4().hex[:6]}'
+
+
+def _version_key(scope):
+    return VERSION_KEY if scope is None else f'{VERSION_KEY}:{scope}'
+
+
+def data_versions(scopes):
+    """Return the current data version of each of `scopes` (None is the global scope) with one get_many()."""
+    cache = get_cache()
+    keys = [_version_key(scope) for scope in scopes]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _new_version(), timeout=None)
+            version = cache.get(key) or _new_version()
+        versions.append(version)
+    return versions
+
+
+def data_version(scope=None):
+    """Return the current data version of `scope` (global when None), initialising it if missing."""
+    return data_versions([scope])[0]
+
+
+def bump_version(scope=None):
+    """Invalidate cached payloads depending on `scope` (everything when None) once the transaction commits."""
+    key = _version_key(scope)
+    transaction.on_commit(lambda: get_cache().set(key, _new_version(), timeout=None))
+
+
+def category_scope(category_id):
+    return f'category:{category_id}'
+
+
+def _count(name):
+    with _counts_lock:
+        _counts[name] += 1
+
+
+def get_or_build(namespace, parts, builder, scopes=()):
+    """
+    Return the cached payload for (namespace, parts) at the current global
+    version and the versions of `scopes`, calling builder() and storing its
+    result on a miss.
+    """
+    cache = get_cache()
+    versions = '.'.join(str(v) for v in data_versions([None, *scopes]))
+    if len(versions) > MAX_VERSIONS_LENGTH:
+        # Keep keys within memcached's 250-character limit
+        versions = hashlib.sha1(versions.encode()).hexdigest()
+    key = ':'.join(['dashboard', namespace, f'v{versions}', *(str(p) for p in parts)])
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value
+    _count('misses')
+    value = builder()
+    cache.set(key, value, timeout=settings.DASHBOARD_CACHE_TTL)
+    return value
+
+
+def stats():
+    """This process's hit and miss counts and the current global version."""
+    with _counts_lock:
+        hits, misses = _counts['hits'], _counts['misses']
+    total = hits + misses
+    return {
+        'version': data_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,85 @@
+"""
+Change feed for the dashboard.
+
+Projects, categories and tombstones of deleted rows are three streams, each
+read by keyset on its (updated_at, uid) index. The feed merges them into
+one (updated_at, uid) order, so a single cursor — the position of the last
+change returned — resumes all three.
+
+updated_at is stamped before the writing transaction commits, so a row can
+become visible after the feed has read past its timestamp. Once a read has
+caught up, the cursor it returns therefore points CHANGE_FEED_OVERLAP
+seconds behind the time of the read rather than at the last change, and the
+next poll re-reads that window. Clients see recent changes more than once
+and skip those whose (uid, updated_at) they have already applied.
+"""
+import heapq
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Category, Tombstone
+from .pagination import decode_keyset_cursor, encode_keyset_cursor, keyset_page
+
+CHANGE_ORDERING = ('updated_at', 'uid')
+# Every uid sorts after the nil uid, so a position on it includes changes at that instant
+NIL_UID = '00000000-0000-0000-0000-000000000000'
+
+
+def resume_point(read_at):
+    """
+    The earliest updated_at a change committed after read_at can carry.
+    A reader that has seen everything committed by read_at resumes here.
+    """
+    return read_at - timedelta(seconds=settings.CHANGE_FEED_OVERLAP)
+
+
+def parse_since(since):
+    """
+    Turn ?since= into a keyset cursor. Accepts a cursor returned by the feed
+    or an ISO-8601 datetime (changes at or after it). Raises ValueError.
+    """
+    if not since:
+        raise ValueError('since is required')
+    moment = parse_datetime(since)
+    if moment is not None:
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return encode_keyset_cursor(CHANGE_ORDERING, [moment, NIL_UID])
+    decode_keyset_cursor(Tombstone, CHANGE_ORDERING, since)
+    return since
+
+
+def change_page(projects, since, limit, year=None):
+    """
+    Return (changes, next_cursor, has_more) where changes are
+    (kind, instance) pairs in (updated_at, uid) order. `projects` is the
+    project queryset to read from (so callers control what is loaded).
+    While has_more is set, next_cursor continues right after the last change;
+    on the last page it rewinds to resume_point() of this read.
+    """
+    read_at = timezone.now()
+    cursor = parse_since(since)
+    categories = Category.objects.all()
+    tombstones = Tombstone.objects.all()
+    if year is not None:
+        projects = projects.filter(category__scorecard_year=year)
+        categories = categories.filter(scorecard_year=year)
+        tombstones = tombstones.filter(scorecard_year=year)
+
+    streams = []
+    more = False
+    for kind, queryset in (('project', projects), ('category', categories), ('deleted', tombstones)):
+        rows, next_cursor = keyset_page(queryset, CHANGE_ORDERING, cursor, limit)
+        more = more or next_cursor is not None
+        streams.append([(row.updated_at, str(row.uid), kind, row) for row in rows])
+
+    merged = list(heapq.merge(*streams, key=lambda item: item[:2]))
+    has_more = more or len(merged) > limit
+    merged = merged[:limit]
+    if has_more:
+        updated_at, uid = merged[-1][:2]
+        cursor = encode_keyset_cursor(CHANGE_ORDERING, [updated_at, uid])
+    else:
+        cursor = encode_keyset_cursor(CHANGE_ORDERING, [resume_point(read_at), NIL_UID])
+    return [(kind, row) for _, _, kind, row in merged], cursor, has_more
@@ -0,0 +1,135 @@
+"""
+Column-wise dashboard payload for one scorecard year, a page of categories
+at a time.
+
+Categories are paged with a keyset cursor (main.pagination) and each page
+carries all of its categories' projects, so the first paint only needs the
+first page. Instead of a list of project objects, every field is one array indexed by
+row, so field names appear once per payload instead of once per project.
+project_status, owner and project_phase are dictionary-encoded: the column
+holds the index of an entry in payload['lookup'][field], whose entries are
+[key, label] pairs ([uid, name] for statuses and owners, [value, label] for
+phases). The lookup tables also fill the dashboard's <select>s. A project's
+`category` is the index of its category in the page's categories columns.
+Missing values are null. Codes are only meaningful within one page: every
+page carries its own lookup tables.
+"""
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from .changes import resume_point
+from .models import Category, Project
+from .pagination import keyset_page
+from .reference import get_reference
+
+CATEGORY_COLUMNS = ('uid', 'category_name', 'objective_weight')
+PROJECT_COLUMNS = (
+    'uid', 'category', 'project_name', 'project_phase', 'project_status', 'owner',
+    'stretch_target_date', 'budget', 'measure_initiative_weight', 'comment',
+)
+
+
+class Dictionary:
+    """Assigns small integer codes to keys; `entries` is the [key, label] lookup table."""
+
+    def __init__(self, entries):
+        self.entries = [[key, label] for key, label in entries]
+        self.codes = {key: code for code, (key, _) in enumerate(self.entries)}
+
+    def encode(self, key):
+        if key is None or key == '':
+            return None
+        code = self.codes.get(key)
+        if code is None:
+            # A value outside the reference data (e.g. a retired phase) labels itself
+            code = self.codes[key] = len(self.entries)
+            self.entries.append([key, key])
+        return code
+
+
+def _str(value):
+    return str(value) if value is not None else None
+
+
+def _uid_text(column):
+    # Reading UUID columns as text skips building a uuid.UUID per value,
+    # which otherwise dominates the payload's build time
+    return Cast(column, output_field=CharField())
+
+
+def _dashed(value):
+    """Canonical 8-4-4-4-12 form of a UUID read as text (SQLite stores 32 hex digits)."""
+    if value is None or len(value) != 32:
+        return value
+    return f'{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}'
+
+
+def _by_text(encode):
+    """encode() for a foreign key column read as text, memoised per distinct value."""
+    memo = {}
+
+    def code(value):
+        try:
+            return memo[value]
+        except KeyError:
+            result = memo[value] = encode(_dashed(value))
+            return result
+    return code
+
+
+def dashboard_columns(year, category_ordering, project_ordering, cursor, limit):
+    """
+    One keyset page of the year's categories, starting after `cursor`, and
+    their projects as columns plus lookup tables. Raises ValueError for a
+    malformed cursor.
+    """
+    # Taken before reading so the change feed replays anything saved meanwhile
+    changes_since = resume_point(timezone.now()).isoformat()
+    page, next_cursor = keyset_page(
+        Category.objects.filter(scorecard_year=year).values(*CATEGORY_COLUMNS), category_ordering, cursor, limit)
+    reference = get_reference()
+    statuses = Dictionary((str(s.uid), s.status_name) for s in reference.statuses)
+    owners = Dictionary((str(uid), name) for uid, name in reference.owner_names().items())
+    phases = Dictionary(reference.phases)
+
+    categories = {name: [] for name in CATEGORY_COLUMNS}
+    category_codes = {}
+    for row in page:
+        category_codes[str(row['uid'])] = len(category_codes)
+        categories['uid'].append(str(row['uid']))
+        categories['category_name'].append(row['category_name'])
+        categories['objective_weight'].append(_str(row['objective_weight']))
+
+    projects = {name: [] for name in PROJECT_COLUMNS}
+    category_code = _by_text(category_codes.__getitem__)
+    status_code = _by_text(statuses.encode)
+    owner_code = _by_text(owners.encode)
+    rows = (Project.objects.filter(category_id__in=[row['uid'] for row in page])
+            .order_by('category_id', *project_ordering)
+            .values_list(_uid_text('uid'), _uid_text('category_id'), 'project_name', 'project_phase',
+                         _uid_text('project_status_id'), _uid_text('owner_id'),
+                         'stretch_target_date', 'budget', 'measure_initiative_weight', 'comment'))
+    for uid, category_id, name, phase, status_id, owner_id, target, budget, weight, comment in rows:
+        projects['uid'].append(_dashed(uid))
+        projects['category'].append(category_code(category_id))
+        projects['project_name'].append(name)
+        projects['project_phase'].append(phases.encode(phase))
+        projects['project_status'].append(status_code(status_id))
+        projects['owner'].append(owner_code(owner_id))
+        projects['stretch_target_date'].append(target.isoformat() if target else None)
+        projects['budget'].append(_str(budget))
+        projects['measure_initiative_weight'].append(_str(weight))
+        projects['comment'].append(comment or None)
+
+    return {
+        'year': year,
+        'changes_since': changes_since,
+        'lookup': {
+            'project_status': statuses.entries,
+            'owner': owners.entries,
+            'project_phase': phases.entries,
+        },
+        'categories': categories,
+        'projects': projects,
+        'next_cursor': next_cursor,
+    }
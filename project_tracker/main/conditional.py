@@ -0,0 +1,132 @@
+"""
+Conditional GET support (ETag / Last-Modified) for read endpoints.
+
+Each validator function computes a cheap fingerprint of everything a
+response shows — one values_list() or aggregate() query — before the view
+runs. If the request's If-None-Match / If-Modified-Since matches, a 304 is
+returned without serializing or rendering anything.
+"""
+import hashlib
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from .cache import data_version
+from .models import Category, Project
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha1('|'.join(str(p) for p in parts).encode()).hexdigest())
+
+
+def _latest(*stamps):
+    stamps = [s for s in stamps if s is not None]
+    return max(stamps) if stamps else None
+
+
+def _precondition(request, state):
+    """(timestamp, 304 response or None) for a validator's state."""
+    etag, last_modified = state
+    # HTTP dates have one-second resolution
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return timestamp, get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def _add_validators(response, etag, timestamp):
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if timestamp is not None:
+            response.headers.setdefault('Last-Modified', http_date(timestamp))
+        # Let browsers keep the copy but revalidate it every time
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional(validators):
+    """
+    Decorate a GET view with validators(request, *args, **kwargs) ->
+    (etag, last_modified) or None. None (e.g. the object does not exist)
+    skips the check and lets the view answer. Async views take async
+    validators.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                try:
+                    state = await validators(request, *args, **kwargs)
+                except ValueError:
+                    state = None
+                if state is None:
+                    return await view(request, *args, **kwargs)
+                timestamp, response = _precondition(request, state)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _add_validators(response, state[0], timestamp)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            try:
+                state = validators(request, *args, **kwargs)
+            except ValueError:
+                # Bad parameters; the view reports them
+                state = None
+            if state is None:
+                return view(request, *args, **kwargs)
+            timestamp, response = _precondition(request, state)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _add_validators(response, state[0], timestamp)
+        return wrapper
+    return decorator
+
+
+async def project_state(request, uid):
+    """Fingerprint of one project_to_dict payload, including the related names it shows."""
+    from .views import selected_year
+    year = selected_year(request, default_current=False)
+    projects = Project.objects.filter(uid=uid)
+    if year is not None:
+        projects = projects.filter(category__scorecard_year=year)
+    row = await projects.values_list(
+        'updated_at', 'category__updated_at', 'project_status__updated_at', 'owner__updated_at').afirst()
+    if row is None:
+        return None
+    return make_etag('project', uid, *row), _latest(*row)
+
+
+async def category_state(request, uid):
+    from .views import selected_year
+    year = selected_year(request, default_current=False)
+    categories = Category.objects.filter(uid=uid)
+    if year is not None:
+        categories = categories.filter(scorecard_year=year)
+    updated_at = await categories.values_list('updated_at', flat=True).afirst()
+    if updated_at is None:
+        return None
+    return make_etag('category', uid, updated_at), updated_at
+
+
+def dashboard_state(request, *args, **kwargs):
+    """
+    Fingerprint of a year's dashboard: newest category and project change
+    and row counts (so deletes show up) in one aggregate, plus the global
+    dashboard data version, which moves on status, user and category-list
+    changes. The page also shows the viewer, so their id is included.
+    """
+    from .views import selected_year
+    year = selected_year(request)
+    summary = Category.objects.filter(scorecard_year=year).aggregate(
+        category_updated=Max('updated_at'),
+        categories=Count('uid', distinct=True),
+        project_updated=Max('project__updated_at'),
+        projects=Count('project__uid'),
+    )
+    etag = make_etag('dashboard', year, request.user.pk, data_version(), *summary.values())
+    return etag, _latest(summary['category_updated'], summary['project_updated'])
@@ -0,0 +1,118 @@
+"""
+Daily digest of projects that need attention, one email per owner.
+
+Every flagged project is read with one query per run, ordered by owner and
+streamed in chunks, so rows are grouped into one message per owner as they
+arrive. Messages go through the users.outbox with a dedupe key per owner
+and day, `chunk_size` per insert; the outbox worker sends them through the
+provider's batch API and retries, and running the digest again the same
+day queues nothing new.
+"""
+import json
+from datetime import timedelta
+from itertools import groupby
+from pathlib import Path
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from users.outbox import enqueue_emails
+from .models import Project
+
+ATTENTION_STATUSES = ('At Risk', 'Delayed')
+# Projects in these states are not flagged just for an approaching date
+DONE_STATUSES = ('Completed',)
+DONE_PHASES = ('Live',)
+DEFAULT_DAYS = 14
+DEFAULT_CHUNK_SIZE = 500
+# A digest not delivered within this long is dropped instead of sent late
+DIGEST_EXPIRY = timedelta(days=1)
+
+DIGEST_COLUMNS = (
+    'owner_id', 'owner__email', 'owner__first_name', 'owner__last_name',
+    'project_name', 'project_phase', 'stretch_target_date',
+    'project_status__status_name', 'category__category_name', 'category__scorecard_year',
+)
+
+
+def _flagged(days, today):
+    due_soon = (Q(stretch_target_date__gte=today, stretch_target_date__lte=today + timedelta(days=days))
+                & ~Q(project_status__status_name__in=DONE_STATUSES)
+                & ~Q(project_phase__in=DONE_PHASES))
+    return Project.objects.filter(
+        Q(project_status__status_name__in=ATTENTION_STATUSES) | due_soon, owner__is_active=True)
+
+
+def flagged_projects(days=DEFAULT_DAYS, today=None):
+    """Rows for every project at risk, delayed, or due within `days`, ordered by owner."""
+    today = today or timezone.localdate()
+    return _flagged(days, today).order_by('owner_id', 'stretch_target_date', 'project_name').values_list(*DIGEST_COLUMNS)
+
+
+def digest_key(owner_id, today):
+    return f'digest:{owner_id}:{today.isoformat()}'
+
+
+def build_messages(days=DEFAULT_DAYS, today=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one digest message dict per active owner with flagged projects."""
+    today = today or timezone.localdate()
+    horizon = today + timedelta(days=days)
+    rows = flagged_projects(days, today).iterator(chunk_size=chunk_size)
+    yield from _owner_messages(rows, today, horizon)
+
+
+def _owner_messages(rows, today, horizon):
+    for owner_id, owner_rows in groupby(rows, key=lambda row: row[0]):
+        projects = []
+        for (_, email, first_name, last_name, name, phase, target_date, status, category, year) in owner_rows:
+            projects.append({
+                'project_name': name,
+                'project_phase': phase,
+                'stretch_target_date': target_date,
+                'status_name': status,
+                'category_name': category,
+                'scorecard_year': year,
+                'due_soon': today <= target_date <= horizon,
+            })
+        owner_name = f'{first_name} {last_name}'.strip() or email
+        yield {
+            'uid': owner_id,
+            'dedupe_key': digest_key(owner_id, today),
+            'to_email': email,
+            'to_name': owner_name,
+            'subject': f'{len(projects)} project{"s" if len(projects) != 1 else ""} need your attention',
+            'html_content': render_to_string('main/email/digest.html', {'owner_name': owner_name, 'projects': projects}),
+        }
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def send_digest(days=DEFAULT_DAYS, chunk_size=DEFAULT_CHUNK_SIZE, dry_run_dir=None):
+    """
+    Build the digest and queue it in the outbox, `chunk_size` owners per
+    insert. With dry_run_dir, messages are written there (one .html per
+    owner plus index.json) instead. Returns the number of messages queued
+    or written; owners already queued today are not counted again.
+    """
+    messages = build_messages(days, chunk_size=chunk_size)
+    if dry_run_dir:
+        out = Path(dry_run_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        index = []
+        for message in messages:
+            filename = f"{message['uid']}.html"
+            (out / filename).write_text(message['html_content'], encoding='utf-8')
+            index.append({'to_email': message['to_email'], 'subject': message['subject'], 'file': filename})
+        (out / 'index.json').write_text(json.dumps(index, indent=2), encoding='utf-8')
+        return len(index)
+
+    expires_at = timezone.now() + DIGEST_EXPIRY
+    return sum(enqueue_emails(chunk, expires_at) for chunk in _chunks(messages, chunk_size))
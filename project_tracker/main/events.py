@@ -0,0 +1,175 @@
+"""
+Push notifications of project and category changes.
+
+Signal receivers (main.signals) call publish() after commit. The configured
+backend (settings.EVENTS_BACKEND) delivers each event to every subscriber,
+and main.asgi streams them to browsers as Server-Sent Events. Events
+are deliberately small — kind, uid, category and year — so a client can
+decide whether to fetch anything (normally via /projects/changes). A batch
+of project saves (bulk writes, imports) is one 'projects' event listing the
+affected categories, not one event per row.
+
+InProcessBackend fans out only within one process. With several worker
+processes, use ChangeFeedBackend: each process polls the change feed once
+on behalf of all its subscribers, so events from any worker reach everyone.
+
+Subscribers are asyncio queues; an idle connection is a suspended coroutine,
+not a thread.
+"""
+import asyncio
+import json
+import threading
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# Events queued for a client that is not reading are dropped past this point
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def make_event(kind, uid, category_id=None, year=None):
+    return {'kind': kind, 'uid': str(uid), 'category_id': str(category_id) if category_id else None, 'year': year}
+
+
+def make_batch_event(kind, category_ids, count):
+    """One event standing for `count` changes of `kind` in these categories."""
+    return {
+        'kind': kind, 'uid': None, 'category_id': None, 'year': None,
+        'category_ids': sorted(str(c) for c in category_ids), 'count': count,
+    }
+
+
+def format_sse(event, event_type='change'):
+    return f'event: {event_type}\ndata: {json.dumps(event, separators=(",", ":"))}\n\n'
+
+
+class InProcessBackend:
+    """Fans events out to subscribers in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        """Register and return an asyncio.Queue bound to the running loop."""
+        queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers = {s for s in self._subscribers if s[1] is not queue}
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        """Deliver `event` to every subscriber; safe to call from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._offer, queue, event)
+
+    @staticmethod
+    def _offer(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+
+class ChangeFeedBackend(InProcessBackend):
+    """
+    Multi-worker backend: local publishes are ignored, and one task per
+    process reads main.changes every EVENTS_POLL_INTERVAL seconds and fans
+    the results out locally. Costs one feed query per interval per
+    process, however many clients are connected.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._poller = None
+
+    def subscribe(self):
+        queue = super().subscribe()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+        return queue
+
+    def publish(self, event):
+        pass
+
+    async def _poll(self):
+        from .changes import change_page, resume_point
+        from .models import Project
+        cursor = resume_point(timezone.now()).isoformat()
+        # (uid, updated_at) of changes already published; the feed re-reads its overlap window
+        published = set()
+        while self.subscriber_count():
+            await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+            horizon = resume_point(timezone.now())
+            has_more = True
+            while has_more:
+                changes, cursor, has_more = await sync_to_async(change_page)(
+                    Project.objects.only('uid', 'updated_at', 'category_id'), cursor, 200)
+                fresh = []
+                for kind, row in changes:
+                    key = (row.uid, row.updated_at)
+                    if key not in published:
+                        published.add(key)
+                        fresh.append((kind, row))
+                for event in _feed_events(fresh):
+                    InProcessBackend.publish(self, event)
+            # Changes older than this read's window are not read again
+            published = {key for key in published if key[1] >= horizon}
+
+
+def _feed_events(changes):
+    """Events for a page of the feed, with its project changes coalesced into one."""
+    projects = [row for kind, row in changes if kind == 'project']
+    if len(projects) > 1:
+        yield make_batch_event('projects', {row.category_id for row in projects}, len(projects))
+    for kind, row in changes:
+        if kind != 'project' or len(projects) == 1:
+            yield _feed_event(kind, row)
+
+
+def _feed_event(kind, row):
+    if kind == 'project':
+        return make_event('project', row.uid, row.category_id)
+    if kind == 'category':
+        return make_event('category', row.uid, row.uid, row.scorecard_year)
+    return make_event(f'{row.kind}_deleted', row.object_uid, row.category_uid, row.scorecard_year)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.EVENTS_BACKEND)()
+    return _backend
+
+
+def publish(event):
+    get_backend().publish(event)
+
+
+async def stream(queue, heartbeat=None):
+    """Yield SSE frames from `queue`, with a comment line as keep-alive while idle."""
+    heartbeat = heartbeat or settings.EVENTS_HEARTBEAT
+    yield 'retry: 5000\n\n'
+    while True:
+        try:
+            event = await asyncio.wait_for(queue.get(), heartbeat)
+        except asyncio.TimeoutError:
+            yield ': keep-alive\n\n'
+            continue
+        yield format_sse(event)
@@ -0,0 +1,132 @@
+"""
+Streaming CSV and Parquet export of projects.
+
+Rows are read in keyset-paginated chunks ordered by uid. Each chunk is its
+own short query, so the export never holds one SQLite read open for its
+whole duration (a single .iterator() would) and writers are not starved.
+At most one chunk is held in memory at a time.
+
+CSV headers match the columns main.importer reads, so an export can be
+edited and imported again.
+"""
+import csv
+import io
+from .models import Project
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# (column name, values_list lookup); uid must stay first, it is the keyset cursor
+EXPORT_COLUMNS = (
+    ('uid', 'uid'),
+    ('project_name', 'project_name'),
+    ('category', 'category__category_name'),
+    ('scorecard_year', 'category__scorecard_year'),
+    ('project_status', 'project_status__status_name'),
+    ('owner', 'owner__email'),
+    ('project_phase', 'project_phase'),
+    ('stretch_target_date', 'stretch_target_date'),
+    ('budget', 'budget'),
+    ('measure_initiative_weight', 'measure_initiative_weight'),
+    ('comment', 'comment'),
+    ('updated_at', 'updated_at'),
+)
+HEADER = [name for name, _ in EXPORT_COLUMNS]
+
+
+def iter_chunks(scorecard_year=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of value tuples (in EXPORT_COLUMNS order), chunk_size rows at a time."""
+    queryset = Project.objects.order_by('uid').values_list(*(lookup for _, lookup in EXPORT_COLUMNS))
+    if scorecard_year is not None:
+        queryset = queryset.filter(category__scorecard_year=scorecard_year)
+    last_uid = None
+    while True:
+        chunk = queryset.filter(uid__gt=last_uid) if last_uid else queryset
+        rows = list(chunk[:chunk_size])
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        last_uid = rows[-1][0]
+
+
+def iter_csv(scorecard_year=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the CSV export as text, one chunk of rows per item."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    for rows in iter_chunks(scorecard_year, chunk_size):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _StreamSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_schema():
+    import pyarrow as pa
+
+    def decimal(model, name):
+        field = model._meta.get_field(name)
+        return pa.decimal128(field.max_digits, field.decimal_places)
+
+    return pa.schema([
+        ('uid', pa.string()),
+        ('project_name', pa.string()),
+        ('category', pa.string()),
+        ('scorecard_year', pa.int32()),
+        ('project_status', pa.string()),
+        ('owner', pa.string()),
+        ('project_phase', pa.string()),
+        ('stretch_target_date', pa.date32()),
+        ('budget', decimal(Project, 'budget')),
+        ('measure_initiative_weight', decimal(Project, 'measure_initiative_weight')),
+        ('comment', pa.string()),
+        ('updated_at', pa.timestamp('us', tz='UTC')),
+    ])
+
+
+def iter_parquet(scorecard_year=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the Parquet export as bytes, one row group per chunk of rows."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError('Parquet export requires pyarrow (pip install pyarrow)')
+    schema = parquet_schema()
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    try:
+        for rows in iter_chunks(scorecard_year, chunk_size):
+            columns = [list(column) for column in zip(*rows)]
+            columns[0] = [str(uid) for uid in columns[0]]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
@@ -0,0 +1,121 @@
+"""
+Filters, sort keys and facet counts for /projects/query.
+
+Filters combine with AND across parameters and OR within one (?status=a,b).
+Each facet is counted with every filter applied except its own, so picking
+one status still shows how many projects the other statuses would add. That
+is one values().annotate(Count) query per facet, whatever the number of
+distinct values.
+"""
+import datetime
+import uuid
+from django.db.models import Count, Q
+from .models import MAX_SCORECARD_YEAR, MIN_SCORECARD_YEAR, Project
+from .reference import get_reference
+
+# query parameter -> (facet name, Project lookup)
+FILTERS = {
+    'status': ('project_status', 'project_status_id'),
+    'phase': ('project_phase', 'project_phase'),
+    'owner': ('owner', 'owner_id'),
+    'year': ('scorecard_year', 'category__scorecard_year'),
+}
+# ?sort= value -> keyset ordering; uid breaks ties
+SORTS = {
+    'project_name': ('project_name', 'uid'),
+    '-project_name': ('-project_name', '-uid'),
+    'stretch_target_date': ('stretch_target_date', 'uid'),
+    '-stretch_target_date': ('-stretch_target_date', '-uid'),
+    'updated_at': ('updated_at', 'uid'),
+    '-updated_at': ('-updated_at', '-uid'),
+    'measure_initiative_weight': ('measure_initiative_weight', 'uid'),
+    '-measure_initiative_weight': ('-measure_initiative_weight', '-uid'),
+}
+DEFAULT_SORT = 'project_name'
+
+
+def _values(params, name):
+    return [v.strip() for value in params.getlist(name) for v in value.split(',') if v.strip()]
+
+
+def _date(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        return datetime.date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f'Invalid {name}')
+
+
+def parse_filters(params):
+    """
+    {facet: [values]} for the filters present in `params` (a QueryDict),
+    plus 'target_from'/'target_to' dates. Raises ValueError.
+    """
+    phases = {value for value, _ in get_reference().phases}
+    filters = {}
+    for param, (facet, _) in FILTERS.items():
+        values = _values(params, param)
+        if not values:
+            continue
+        try:
+            if param in ('status', 'owner'):
+                values = [uuid.UUID(v) for v in values]
+            elif param == 'year':
+                values = [int(v) for v in values]
+                if not all(MIN_SCORECARD_YEAR <= v <= MAX_SCORECARD_YEAR for v in values):
+                    raise ValueError
+        except ValueError:
+            raise ValueError(f'Invalid {param}')
+        if param == 'phase' and not set(values) <= phases:
+            raise ValueError('Invalid phase')
+        filters[facet] = values
+    for name in ('target_from', 'target_to'):
+        value = _date(params, name)
+        if value is not None:
+            filters[name] = value
+    return filters
+
+
+def parse_sort(params):
+    sort = params.get('sort') or DEFAULT_SORT
+    if sort not in SORTS:
+        raise ValueError(f'Invalid sort; use one of {", ".join(SORTS)}')
+    return sort, SORTS[sort]
+
+
+def filter_q(filters, exclude=None):
+    """Q for every filter in `filters` except facet `exclude`."""
+    condition = Q()
+    for facet, lookup in FILTERS.values():
+        if facet != exclude and facet in filters:
+            condition &= Q(**{f'{lookup}__in': filters[facet]})
+    if 'target_from' in filters:
+        condition &= Q(stretch_target_date__gte=filters['target_from'])
+    if 'target_to' in filters:
+        condition &= Q(stretch_target_date__lte=filters['target_to'])
+    return condition
+
+
+def facet_counts(filters):
+    """{facet: [{'value', 'label', 'count'}]}, most frequent first."""
+    reference = get_reference()
+    labels = {
+        'project_status': {s.uid: s.status_name for s in reference.statuses},
+        'project_phase': dict(reference.phases),
+        'owner': reference.owner_names(),
+        'scorecard_year': {},
+    }
+    facets = {}
+    for facet, lookup in FILTERS.values():
+        rows = (Project.objects.filter(filter_q(filters, exclude=facet))
+                .order_by().values(lookup).annotate(count=Count('uid')))
+        counts = []
+        for row in rows:
+            value = row[lookup]
+            label = labels[facet].get(value, value)
+            counts.append({'value': str(value), 'label': str(label), 'count': row['count']})
+        counts.sort(key=lambda c: (-c['count'], c['label']))
+        facets[facet] = counts
+    return facets
@@ -0,0 +1,217 @@
+"""
+Streaming CSV/XLSX import of scorecard projects.
+
+Rows are read one at a time, names are resolved to foreign keys through
+dictionaries built once per import, and projects are inserted with
+bulk_create in fixed-size batches (one transaction per batch). Memory use
+depends on the batch size, not on the file size.
+
+Expected columns (header row, case-insensitive): project_name, category,
+scorecard_year (optional, disambiguates categories that share a name),
+project_status, owner (email or "First Last"), project_phase,
+stretch_target_date, budget, measure_initiative_weight, comment. An
+optional uid column upserts: a row whose uid matches a project updates it,
+so a main.exporter CSV can be edited and imported again.
+"""
+import csv
+import uuid
+from decimal import Decimal
+from django.db import transaction
+from users.models import User
+from .models import Category, Project, Status
+from .payloads import PayloadError, ProjectCreate, validate
+from .signals import projects_bulk_saved
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+# Written when a row's uid matches an existing project
+UPSERT_FIELDS = (
+    'project_name', 'category', 'project_phase', 'project_status', 'owner', 'stretch_target_date',
+    'budget', 'measure_initiative_weight', 'comment', 'updated_at',
+)
+
+HEADER_ALIASES = {
+    'name': 'project_name',
+    'project': 'project_name',
+    'category_name': 'category',
+    'status': 'project_status',
+    'status_name': 'project_status',
+    'owner_email': 'owner',
+    'phase': 'project_phase',
+    'target_date': 'stretch_target_date',
+    'weight': 'measure_initiative_weight',
+}
+
+
+def _normalise_header(name):
+    key = str(name or '').strip().lower().replace(' ', '_')
+    return HEADER_ALIASES.get(key, key)
+
+
+def read_csv(stream):
+    """Yield one dict per data row of a text-mode CSV stream."""
+    reader = csv.reader(stream)
+    header = [_normalise_header(h) for h in next(reader, [])]
+    for values in reader:
+        if any(v.strip() for v in values):
+            yield dict(zip(header, values))
+
+
+def read_xlsx(stream):
+    """Yield one dict per data row of the first sheet of an XLSX file."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError('XLSX import requires openpyxl (pip install openpyxl)')
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [_normalise_header(h) for h in next(rows, ())]
+        for values in rows:
+            if any(v not in (None, '') for v in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+class _Lookups:
+    """Name -> instance maps for categories, statuses and owners, built once per import."""
+
+    def __init__(self):
+        self.categories = {}
+        self.categories_by_name = {}
+        for category in Category.objects.only('uid', 'category_name', 'scorecard_year'):
+            name = category.category_name.strip().lower()
+            self.categories[(name, category.scorecard_year)] = category
+            # None marks a name shared by several years
+            self.categories_by_name[name] = None if name in self.categories_by_name else category
+        self.statuses = {s.status_name.strip().lower(): s for s in Status.objects.only('uid', 'status_name')}
+        self.owners = {}
+        for owner in User.objects.only('uid', 'email', 'first_name', 'last_name'):
+            self.owners[owner.email.lower()] = owner
+            full_name = f'{owner.first_name} {owner.last_name}'.strip().lower()
+            if full_name:
+                self.owners.setdefault(full_name, owner)
+
+    def category(self, name, year):
+        name = str(name or '').strip().lower()
+        if year not in (None, ''):
+            try:
+                return self.categories.get((name, int(year)))
+            except (TypeError, ValueError):
+                raise PayloadError('Invalid scorecard_year')
+        category = self.categories_by_name.get(name)
+        if category is None and name in self.categories_by_name:
+            raise PayloadError('Category exists in several years; add a scorecard_year column')
+        return category
+
+    def status(self, name):
+        return self.statuses.get(str(name or '').strip().lower())
+
+    def owner(self, name):
+        return self.owners.get(str(name or '').strip().lower())
+
+
+def _uid(value):
+    value = str(value or '').strip()
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise PayloadError('Invalid uid')
+
+
+def _build_project(row, lookups):
+    uid = _uid(row.get('uid'))
+    category = lookups.category(row.get('category'), row.get('scorecard_year'))
+    if category is None:
+        raise PayloadError('Category not found')
+    status = lookups.status(row.get('project_status'))
+    if status is None:
+        raise PayloadError('Status not found')
+    owner = lookups.owner(row.get('owner'))
+    if owner is None:
+        raise PayloadError('Owner not found')
+    payload = validate(ProjectCreate, {
+        'project_name': row.get('project_name'),
+        'project_phase': row.get('project_phase'),
+        'stretch_target_date': row.get('stretch_target_date'),
+        'budget': row.get('budget'),
+        'measure_initiative_weight': row.get('measure_initiative_weight'),
+        'comment': row.get('comment') or None,
+        'project_status_id': status.uid,
+        'owner_id': owner.uid,
+    })
+    project = Project(
+        project_name=payload.project_name,
+        category=category,
+        project_phase=payload.project_phase,
+        project_status=status,
+        owner=owner,
+        stretch_target_date=payload.stretch_target_date,
+        budget=payload.budget if payload.budget is not None else Decimal('0.0'),
+        measure_initiative_weight=payload.measure_initiative_weight if payload.measure_initiative_weight is not None else Decimal('0.0'),
+        comment=payload.comment,
+    )
+    if uid is not None:
+        project.uid = uid
+    return project, uid is not None
+
+
+def import_projects(rows, batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Insert projects from an iterable of row dicts, updating those whose uid
+    already exists.
+
+    Invalid rows are skipped and reported (line numbers count the header as
+    line 1); valid rows are written in batches of `batch_size`. Only the
+    first MAX_REPORTED_ERRORS errors are kept. A uid repeated within a batch
+    is an error; repeated in a later batch, it updates the project again.
+    """
+    lookups = _Lookups()
+    created = updated = failed = 0
+    errors = []
+    batch = []
+    upsert_uids = set()
+
+    def flush():
+        nonlocal created, updated
+        existing = {}
+        if upsert_uids:
+            existing = dict(Project.objects.filter(uid__in=upsert_uids).values_list('uid', 'category_id'))
+        for project in batch:
+            if project.uid in existing:
+                # Lets the bulk-save receivers refresh a moved project's old category
+                project._loaded_category_id = existing[project.uid]
+        if batch and not dry_run:
+            with transaction.atomic():
+                if existing:
+                    Project.objects.bulk_create(
+                        batch, update_conflicts=True, unique_fields=['uid'], update_fields=UPSERT_FIELDS)
+                else:
+                    Project.objects.bulk_create(batch)
+            projects_bulk_saved.send(sender=Project, projects=list(batch))
+        created += len(batch) - len(existing)
+        updated += len(existing)
+        batch.clear()
+        upsert_uids.clear()
+
+    for line, row in enumerate(rows, start=2):
+        try:
+            project, explicit_uid = _build_project(row, lookups)
+            if explicit_uid:
+                # One upsert cannot write a row twice
+                if project.uid in upsert_uids:
+                    raise PayloadError('Duplicate uid')
+                upsert_uids.add(project.uid)
+        except PayloadError as e:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'line': line, 'error': str(e)})
+            continue
+        batch.append(project)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return {'created': created, 'updated': updated, 'failed': failed, 'errors': errors, 'dry_run': dry_run}
@@ -0,0 +1,221 @@
+import gc
+import io
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver
+from main.models import Category, Project, Status
+from main.seeding import seed
+from users.models import User
+
+DEFAULT_BASELINE = 'benchmarks/endpoints.json'
+# Latency regressions smaller than this are treated as noise
+LATENCY_SLACK_MS = 2.0
+
+
+def url_names():
+    """Every named route of main.urls and users.urls, as reverse() names."""
+    names = set()
+    for pattern in get_resolver().url_patterns:
+        namespace = getattr(pattern, 'namespace', None)
+        if getattr(pattern, 'urlconf_module', None) is None:
+            continue
+        module = getattr(pattern.urlconf_module, '__name__', '')
+        if module not in ('main.urls', 'users.urls'):
+            continue
+        for child in pattern.url_patterns:
+            if child.name:
+                names.add(f'{namespace}:{child.name}' if namespace else child.name)
+    return names
+
+
+def endpoint_cases(year, category, project, status, owner):
+    """
+    name -> (client, method, path, request kwargs). 'staff' requests are made
+    as a logged-in staff user, 'anon' as an anonymous visitor.
+    """
+    json_body = {'content_type': 'application/json'}
+    csv_upload = lambda: {'data': {'file': _csv_file(category, status, owner)}}  # noqa: E731
+    return {
+        'index': ('staff', 'get', f'/?year={year}', {}),
+        'dashboard_data': ('staff', 'get', f'/dashboard/data?year={year}', {}),
+        'dashboard_cache_stats': ('staff', 'get', '/dashboard/cache-stats/', {}),
+        'metrics': ('staff', 'get', '/metrics', {}),
+        'project_detail': ('staff', 'get', f'/project/{project.uid}/', {}),
+        'project_batch': ('staff', 'get', f'/projects/batch?uids={project.uid}', {}),
+        'project_query': ('staff', 'get', f'/projects/query?year={year}&status={status.uid}&sort=-stretch_target_date', {}),
+        'project_search': ('staff', 'get', f'/projects/search?q={project.project_name[:4]}', {}),
+        'project_changes': ('staff', 'get', f'/projects/changes?year={year}&since=2000-01-01T00:00:00', {}),
+        'project_bulk': ('staff', 'post', '/projects/bulk/', {
+            'data': json.dumps({'update': [{'uid': str(project.uid), 'comment': 'bench'}]}), **json_body}),
+        'project_import': ('staff', 'post', '/projects/import/?dry_run=1', csv_upload),
+        'scorecard': ('staff', 'get', f'/scorecard/{year}/', {}),
+        'export_projects_csv': ('staff', 'get', f'/export/projects.csv?scorecard_year={year}', {}),
+        'export_projects_parquet': ('staff', 'get', f'/export/projects.parquet?scorecard_year={year}', {}),
+        'project_update': ('staff', 'post', f'/project/{project.uid}/update/', {
+            'data': json.dumps({'comment': 'bench'}), **json_body}),
+        'category_detail': ('staff', 'get', f'/category/{category.uid}/', {}),
+        'category_update': ('staff', 'post', f'/category/{category.uid}/update/', {
+            'data': json.dumps({'objective_weight': str(category.objective_weight)}), **json_body}),
+        'category_create': ('staff', 'post', '/category/create/', {
+            'data': json.dumps({'category_name': 'Bench category', 'objective_weight': '1.0', 'scorecard_year': year}),
+            **json_body}),
+        'project_create': ('staff', 'post', f'/project/create/{category.uid}', {
+            'data': json.dumps({'project_name': 'Bench project', 'project_status_id': str(status.uid),
+                                'owner_id': str(owner.uid), 'stretch_target_date': f'{year}-06-30'}),
+            **json_body}),
+        'users:login': ('anon', 'get', '/users/login/', {}),
+        'users:request_otp': ('anon', 'post', '/users/request-otp/', {'data': {'email': owner.email}}),
+        'users:verify_otp': ('anon', 'get', '/users/verify-otp/', {}),
+        'users:logout': ('anon', 'get', '/users/logout/', {}),
+        'users:create_user': ('anon', 'get', '/users/create/', {}),
+    }
+
+
+def _csv_file(category, status, owner):
+    content = (
+        'project_name,category,scorecard_year,project_status,owner,stretch_target_date\n'
+        f'Bench import,{category.category_name},{category.scorecard_year},{status.status_name},'
+        f'{owner.email},{category.scorecard_year}-06-30\n'
+    )
+    upload = io.BytesIO(content.encode())
+    upload.name = 'bench.csv'
+    return upload
+
+
+def _consume(response):
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def compare(results, baseline, threshold):
+    """Human-readable regressions of `results` against `baseline`."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        # p95 is reported but too noisy on shared machines to gate on
+        limit = previous['p50_ms'] * (1 + threshold) + LATENCY_SLACK_MS
+        if current['p50_ms'] > limit:
+            regressions.append(f'{name}: p50 {current["p50_ms"]}ms > {limit:.1f}ms (baseline {previous["p50_ms"]}ms)')
+        if current['queries'] > previous['queries']:
+            regressions.append(f'{name}: {current["queries"]} queries > baseline {previous["queries"]}')
+        if current['peak_kb'] > previous['peak_kb'] * (1 + threshold) + 64:
+            regressions.append(f'{name}: peak {current["peak_kb"]}KB > baseline {previous["peak_kb"]}KB')
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database, request every URL of main.urls and users.urls, '
+        'and report p50/p95 latency, SQL queries and peak memory per endpoint. '
+        'Fails when a run regresses against the JSON baseline by more than --threshold.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=10)
+        parser.add_argument('--categories', type=int, default=50, help='Categories per year.')
+        parser.add_argument('--projects', type=int, default=200, help='Projects per category.')
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per endpoint.')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+        parser.add_argument('--save-baseline', action='store_true', help='Write this run as the new baseline.')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Allowed relative regression (0.25 = 25%%).')
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the seeded test database between runs.')
+
+    def handle(self, *args, **options):
+        # Never touch the configured database: run against Django's test database
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            if not Project.objects.exists():
+                started = time.perf_counter()
+                counts = seed(options['years'], options['categories'], options['projects'], options['users'])
+                self.stdout.write(f'Seeded {counts} in {time.perf_counter() - started:.1f}s')
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'], EMAIL_OUTBOX_IN_PROCESS=False):
+                results = self.run_cases(options['iterations'])
+        finally:
+            if not options['keepdb']:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f'{"endpoint":28s} {"p50 ms":>8s} {"p95 ms":>8s} {"queries":>8s} {"peak KB":>9s}')
+        for name, r in results.items():
+            self.stdout.write(f'{name:28s} {r["p50_ms"]:8.2f} {r["p95_ms"]:8.2f} {r["queries"]:8d} {r["peak_kb"]:9.1f}')
+
+        path = Path(options['baseline'])
+        if options['save_baseline']:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(results, indent=2, sort_keys=True))
+            self.stdout.write(f'Baseline written to {path}')
+            return
+        if not path.exists():
+            self.stdout.write(f'No baseline at {path}; run with --save-baseline to create one.')
+            return
+        regressions = compare(results, json.loads(path.read_text()), options['threshold'])
+        if regressions:
+            raise CommandError('Regressions against baseline:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(f'No regressions against {path}.')
+
+    def run_cases(self, iterations):
+        staff = User.objects.order_by('email').first()
+        staff.is_staff = True
+        staff.save(update_fields=['is_staff'])
+        year = Category.objects.order_by('-scorecard_year').values_list('scorecard_year', flat=True).first()
+        category = Category.objects.filter(scorecard_year=year, project__isnull=False).order_by('category_name').first()
+        project = Project.objects.filter(category=category).order_by('project_name').first()
+        cases = endpoint_cases(year, category, project, Status.objects.first(), project.owner)
+
+        missing = url_names() - set(cases)
+        if missing:
+            raise CommandError(f'No benchmark case for: {", ".join(sorted(missing))}')
+
+        clients = {'staff': Client(), 'anon': Client()}
+        clients['staff'].force_login(staff)
+        results = {}
+        for name, (who, method, path, kwargs) in cases.items():
+            client = clients[who]
+
+            def call():
+                request_kwargs = kwargs() if callable(kwargs) else kwargs
+                response = _consume(getattr(client, method)(path, **request_kwargs))
+                if response.status_code >= 400:
+                    raise CommandError(f'{name}: {method.upper()} {path} returned {response.status_code}')
+                return response
+
+            call()  # warm caches and connections
+            # queries_log is a bounded deque; once full, captures would count zero
+            reset_queries()
+            tracemalloc.start()
+            with CaptureQueriesContext(connection) as queries:
+                call()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            timings = []
+            # Collector pauses would otherwise land on random iterations as p95 outliers
+            gc.collect()
+            gc.disable()
+            try:
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    call()
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                gc.enable()
+            timings.sort()
+            results[name] = {
+                'p50_ms': round(statistics.median(timings), 2),
+                'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+                'queries': len(queries),
+                'peak_kb': round(peak / 1024, 1),
+            }
+        return results
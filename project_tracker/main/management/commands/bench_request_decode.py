@@ -0,0 +1,72 @@
+import json
+import timeit
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.utils.dateparse import parse_date
+from main.payloads import ProjectUpdate, parse_body
+
+FIELDS = (
+    'project_name', 'project_phase', 'stretch_target_date', 'budget', 'measure_initiative_weight',
+    'owner_id', 'comment', 'project_status_id',
+)
+SAMPLE = {
+    'project_name': 'Core banking upgrade',
+    'project_phase': 'Development',
+    'stretch_target_date': '2026-09-30',
+    'budget': '125000.50',
+    'measure_initiative_weight': '2.5',
+    'owner_id': '2f1f6a1e-1a4a-4c55-9f55-6b1a0a1f0c11',
+    'comment': 'Vendor contract signed; integration testing starts next sprint.',
+    'project_status_id': '8b0d8c62-0f4f-4c2b-9a7a-3f3b9b7d0e22',
+}
+
+
+def legacy_decode(request):
+    """The per-field decode project_update used before payloads.py, without the DB lookups."""
+    data = request.POST if request.POST else None
+    values = {}
+    for field in FIELDS:
+        values[field] = data.get(field) if data else json.loads(request.body).get(field)
+    if values['stretch_target_date']:
+        values['stretch_target_date'] = parse_date(values['stretch_target_date'])
+    try:
+        values['budget'] = float(values['budget'])
+    except Exception:
+        pass
+    try:
+        values['measure_initiative_weight'] = Decimal(str(values['measure_initiative_weight']))
+    except Exception:
+        pass
+    return values
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-request body decode cost of project_update before and after payloads.py.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        body = json.dumps(SAMPLE)
+
+        def make_request():
+            return factory.post('/project/x/update/', body, content_type='application/json')
+
+        # A fresh request per call so neither path benefits from Django's cached request.POST
+        cases = {
+            'legacy (json.loads per field)': lambda: legacy_decode(make_request()),
+            'schema (decode once + pydantic)': lambda: parse_body(make_request(), ProjectUpdate),
+            'request construction only': make_request,
+        }
+        n = options['iterations']
+        results = {}
+        for name, fn in cases.items():
+            best = min(timeit.repeat(fn, number=n, repeat=options['repeat']))
+            results[name] = best / n * 1e6
+        baseline = results.pop('request construction only')
+        self.stdout.write(f'{n} iterations, best of {options["repeat"]}; request construction ({baseline:.2f} us) subtracted')
+        for name, micros in results.items():
+            self.stdout.write(f'  {name:34s} {micros - baseline:8.2f} us/request')
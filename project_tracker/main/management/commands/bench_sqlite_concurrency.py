@@ -0,0 +1,131 @@
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import OperationalError
+from django.test import Client
+from django.test.utils import override_settings
+from main.models import Category, Project
+from users.models import User
+
+# SQLite's own defaults, for the "before" run
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+# Connection OPTIONS this project sets on top of Django's defaults; the
+# "before" run drops them (Django then opens DEFERRED transactions)
+TUNED_OPTIONS = ('transaction_mode',)
+
+
+class Command(BaseCommand):
+    help = (
+        'Run reader and writer threads against the dashboard and project_update '
+        'endpoints on a scratch copy of the database, with SQLite and Django defaults and with '
+        'settings.SQLITE_PRAGMAS and the configured transaction mode, and report throughput and lock errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=10.0)
+        parser.add_argument('--profile', choices=('default', 'tuned', 'both'), default='both')
+
+    def handle(self, *args, **options):
+        db = connections['default']
+        if db.vendor != 'sqlite':
+            raise CommandError('This benchmark only applies to SQLite.')
+        source = Path(db.settings_dict['NAME'])
+        if not source.exists():
+            raise CommandError(f'{source} does not exist; run migrate and load some data first.')
+        user = User.objects.filter(is_active=True).order_by('pk').first()
+        categories = list(Category.objects.values_list('uid', 'scorecard_year'))
+        projects = list(Project.objects.values_list('uid', flat=True)[:500])
+        if not (user and categories and projects):
+            raise CommandError('The database needs at least one user, category and project.')
+
+        profiles = ['default', 'tuned'] if options['profile'] == 'both' else [options['profile']]
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile in profiles:
+                copy = Path(tmp) / f'{profile}.sqlite3'
+                # The backup API gives a consistent copy even if the live DB is in WAL mode
+                pragmas = DEFAULT_PRAGMAS if profile == 'default' else settings.SQLITE_PRAGMAS
+                with sqlite3.connect(source) as src, sqlite3.connect(copy) as dst:
+                    src.backup(dst)
+                    # Switching journal mode needs exclusive access, so do it before the threads start
+                    dst.execute(f"PRAGMA journal_mode={pragmas.get('journal_mode') or 'DELETE'}")
+                db_options = db.settings_dict.get('OPTIONS', {})
+                if profile == 'default':
+                    db_options = {k: v for k, v in db_options.items() if k not in TUNED_OPTIONS}
+                results[profile] = self.run_profile(copy, pragmas, db_options, user, categories, projects, options)
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_profile(self, path, pragmas, db_options, user, categories, projects, options):
+        database = connections.settings['default']
+        original_name, original_options = database['NAME'], database.get('OPTIONS', {})
+        connections['default'].close()
+        # Each thread opens its own connection from these settings
+        database['NAME'] = str(path)
+        database['OPTIONS'] = db_options
+        stop = threading.Event()
+        counts = {'reads': 0, 'writes': 0, 'lock_errors': 0, 'other_errors': 0}
+        lock = threading.Lock()
+
+        def record(key):
+            with lock:
+                counts[key] += 1
+
+        def logged_in_client():
+            client = Client()
+            client.force_login(user)
+            return client
+
+        def reader(client):
+            while not stop.is_set():
+                uid, year = random.choice(categories)
+                url = random.choice((f'/dashboard/data?year={year}', f'/category/{uid}/'))
+                self.request(lambda: client.get(url), 'reads', record)
+            connections.close_all()
+
+        def writer(client):
+            while not stop.is_set():
+                uid = random.choice(projects)
+                body = json.dumps({'comment': f'bench {time.time()}'})
+                self.request(lambda: client.post(f'/project/{uid}/update/', body, content_type='application/json'), 'writes', record)
+            connections.close_all()
+
+        try:
+            with override_settings(SQLITE_PRAGMAS=pragmas, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                threads = [threading.Thread(target=reader, args=(logged_in_client(),)) for _ in range(options['readers'])]
+                threads += [threading.Thread(target=writer, args=(logged_in_client(),)) for _ in range(options['writers'])]
+                started = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                time.sleep(options['seconds'])
+                stop.set()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - started
+        finally:
+            connections['default'].close()
+            database['NAME'], database['OPTIONS'] = original_name, original_options
+        return {
+            'pragmas': pragmas,
+            'transaction_mode': db_options.get('transaction_mode') or 'DEFERRED',
+            'reads_per_s': round(counts['reads'] / elapsed, 1),
+            'writes_per_s': round(counts['writes'] / elapsed, 1),
+            **counts,
+        }
+
+    @staticmethod
+    def request(send, kind, record):
+        try:
+            response = send()
+        except OperationalError as e:
+            record('lock_errors' if 'locked' in str(e) or 'busy' in str(e) else 'other_errors')
+            return
+        record(kind if response.status_code < 400 else 'other_errors')
@@ -0,0 +1,91 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from main.models import Category, Project
+from users.models import User
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'req_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare requests/sec and p50/p99 latency of the JSON endpoints through '
+        "Django's WSGI handler (one thread per in-flight request) and its ASGI "
+        'handler (one event loop), in-process with the same concurrency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_active=True).order_by('pk').first()
+        project_ids = list(Project.objects.values_list('uid', flat=True)[:200])
+        category_ids = list(Category.objects.values_list('uid', flat=True)[:200])
+        if not (user and project_ids and category_ids):
+            raise CommandError('The database needs at least one user, category and project.')
+        paths = [f'/project/{uid}/' for uid in project_ids] + [f'/category/{uid}/' for uid in category_ids]
+        client = Client()
+        client.force_login(user)
+        cookies = client.cookies
+        n, concurrency = options['requests'], options['concurrency']
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            results = {
+                'wsgi': self.run_wsgi(cookies, paths, n, concurrency),
+                'asgi': asyncio.run(self.run_asgi(cookies, paths, n, concurrency)),
+            }
+        self.stdout.write(f'{n} requests, concurrency {concurrency}')
+        for name, result in results.items():
+            self.stdout.write(f'  {name}: ' + ', '.join(f'{k}={v}' for k, v in result.items()))
+
+    def run_wsgi(self, cookies, paths, n, concurrency):
+        local = threading.local()
+
+        def fetch(i):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+                local.client.cookies = cookies
+            started = time.perf_counter()
+            response = local.client.get(paths[i % len(paths)])
+            if response.status_code != 200:
+                raise CommandError(f'{paths[i % len(paths)]} returned {response.status_code}')
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # Each worker thread keeps its own DB connection, as under a threaded WSGI server
+            latencies = list(pool.map(fetch, range(n)))
+        return summarize(latencies, time.perf_counter() - started)
+
+    async def run_asgi(self, cookies, paths, n, concurrency):
+        client = AsyncClient()
+        client.cookies = cookies
+        queue = iter(range(n))
+        latencies = []
+
+        async def worker():
+            for i in queue:
+                started = time.perf_counter()
+                response = await client.get(paths[i % len(paths)])
+                if response.status_code != 200:
+                    raise CommandError(f'{paths[i % len(paths)]} returned {response.status_code}')
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, time.perf_counter() - started)
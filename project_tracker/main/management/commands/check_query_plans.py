@@ -0,0 +1,81 @@
+import datetime
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from main.exporter import EXPORT_COLUMNS
+from main.models import Category, CategoryScore, Project, Tombstone
+from main.views import project_queryset
+
+SAMPLE_UID = uuid.UUID(int=1)
+
+
+def key_queries():
+    """(name, queryset) pairs for the access paths the app depends on."""
+    today = datetime.date.today()
+    year = today.year
+    now = timezone.now()
+    return [
+        ('dashboard: first category page',
+         Category.objects.order_by('category_name', 'uid')[:26]),
+        ('dashboard: next category page',
+         Category.objects.filter(Q(category_name__gt='M') | Q(category_name='M', uid__gt=SAMPLE_UID))
+         .order_by('category_name', 'uid')[:26]),
+        ('dashboard: categories of a year',
+         Category.objects.filter(scorecard_year=year).order_by('category_name', 'uid')[:26]),
+        ('dashboard: columnar projects of a year',
+         Project.objects.filter(category__scorecard_year=year).order_by('category_id', 'project_name', 'uid')
+         .values_list('uid', 'category_id', 'project_status_id', 'owner_id')),
+        ('dashboard: projects of a category',
+         project_queryset().filter(category_id=SAMPLE_UID).order_by('project_name', 'uid')[:201]),
+        ('projects: batch read',
+         project_queryset().filter(uid__in=[SAMPLE_UID, uuid.UUID(int=2)])),
+        ('projects: by category and status',
+         Project.objects.filter(category_id=SAMPLE_UID, project_status_id=SAMPLE_UID)),
+        ('projects: by target date range',
+         Project.objects.filter(stretch_target_date__range=(today, today + datetime.timedelta(days=14)))),
+        ('projects: by owner',
+         Project.objects.filter(owner_id=SAMPLE_UID).order_by('stretch_target_date')),
+        ('export: chunk for a year',
+         Project.objects.filter(category__scorecard_year=year, uid__gt=SAMPLE_UID).order_by('uid')
+         .values_list(*(lookup for _, lookup in EXPORT_COLUMNS))[:2000]),
+        ('changes: projects since cursor',
+         project_queryset().filter(Q(updated_at__gt=now) | Q(updated_at=now, uid__gt=SAMPLE_UID))
+         .order_by('updated_at', 'uid')[:26]),
+        ('changes: tombstones since cursor',
+         Tombstone.objects.filter(Q(updated_at__gt=now) | Q(updated_at=now, uid__gt=SAMPLE_UID))
+         .order_by('updated_at', 'uid')[:26]),
+        ('scorecard: year summary',
+         CategoryScore.objects.filter(scorecard_year=year).select_related('category')),
+    ]
+
+
+def full_scans(plan):
+    """Plan lines that read a whole table instead of searching an index."""
+    flagged = []
+    for line in plan.splitlines():
+        detail = line.split(' ', 3)[-1] if line[:1].isdigit() else line
+        if detail.startswith('SCAN ') and 'USING' not in detail and 'CONSTANT ROW' not in detail:
+            flagged.append(detail)
+    return flagged
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN QUERY PLAN on the app's key queries and fail if any does a full table scan."
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('check_query_plans understands SQLite query plans only.')
+        failures = 0
+        for name, queryset in key_queries():
+            plan = queryset.explain()
+            scans = full_scans(plan)
+            status = self.style.ERROR('FULL SCAN') if scans else self.style.SUCCESS('ok')
+            self.stdout.write(f'{name}: {status}')
+            if scans or options['verbosity'] > 1:
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
+            failures += bool(scans)
+        if failures:
+            raise CommandError(f'{failures} key queries do a full table scan.')
@@ -0,0 +1,34 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from main.importer import DEFAULT_BATCH_SIZE, import_projects, read_csv, read_xlsx
+
+
+class Command(BaseCommand):
+    help = 'Stream projects from a CSV or XLSX file into the database in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate rows without inserting them.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('xlsx' if path.lower().endswith('.xlsx') else 'csv')
+        try:
+            if fmt == 'xlsx':
+                with open(path, 'rb') as f:
+                    result = import_projects(read_xlsx(f), options['batch_size'], options['dry_run'])
+            else:
+                with open(path, newline='', encoding='utf-8-sig') as f:
+                    result = import_projects(read_csv(f), options['batch_size'], options['dry_run'])
+        except (OSError, ImportError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        verb = 'Validated' if result['dry_run'] else 'Imported'
+        self.stdout.write(
+            f"{verb} {result['created']} new and {result['updated']} existing projects, {result['failed']} rows failed.")
+        if options['verbosity'] > 1:
+            self.stdout.write(json.dumps(result))
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from main import events
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Open many idle /projects/events streams against project_tracker.asgi '
+        'in-process, publish one change, and report thread usage and delivery.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=300)
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(is_active=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('The database needs at least one active user.')
+        client = Client()
+        client.force_login(user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            report = asyncio.run(self.run(cookie, options['connections'], options['timeout']))
+        for key, value in report.items():
+            self.stdout.write(f'{key:28s} {value}')
+        if report['threads_while_idle'] >= options['connections']:
+            raise CommandError('Idle connections are holding a thread each.')
+
+    async def run(self, cookie, count, timeout):
+        from project_tracker.asgi import application
+        backend = events.get_backend()
+        threads_before = threading.active_count()
+        connections = [Connection(cookie) for _ in range(count)]
+        tasks = [asyncio.create_task(application(c.scope(), c.receive, c.send)) for c in connections]
+
+        deadline = time.monotonic() + timeout
+        while backend.subscriber_count() < count:
+            if time.monotonic() > deadline:
+                raise CommandError(f'Only {backend.subscriber_count()} of {count} streams opened.')
+            await asyncio.sleep(0.05)
+        opened = time.monotonic()
+        threads_idle = threading.active_count()
+
+        # Publish from another thread, the way a signal receiver in a sync view would
+        published = time.monotonic()
+        await asyncio.to_thread(events.publish, events.make_event('project', '00000000-0000-0000-0000-000000000000'))
+        while not all(c.delivered.is_set() for c in connections):
+            if time.monotonic() > deadline:
+                break
+            await asyncio.sleep(0.01)
+        delivered = sum(c.delivered.is_set() for c in connections)
+        latency = max((c.delivered_at - published for c in connections if c.delivered_at), default=0)
+
+        for c in connections:
+            c.disconnected.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return {
+            'connections': count,
+            'open_seconds': round(opened - (deadline - timeout), 2),
+            'threads_before': threads_before,
+            'threads_while_idle': threads_idle,
+            'events_delivered': f'{delivered}/{count}',
+            'max_delivery_ms': round(latency * 1000, 1),
+            'subscribers_after_close': backend.subscriber_count(),
+        }
+
+
+class Connection:
+    """Minimal ASGI client side of one SSE request."""
+
+    def __init__(self, cookie):
+        self.cookie = cookie
+        self.request_sent = False
+        self.disconnected = asyncio.Event()
+        self.delivered = asyncio.Event()
+        self.delivered_at = None
+        self.status = None
+
+    def scope(self):
+        return {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': '/projects/events', 'raw_path': b'/projects/events',
+            'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'cookie', self.cookie.encode()), (b'accept', b'text/event-stream')],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+
+    async def receive(self):
+        if not self.request_sent:
+            self.request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        elif message['type'] == 'http.response.body' and b'event: change' in message.get('body', b''):
+            if not self.delivered.is_set():
+                self.delivered_at = time.monotonic()
+                self.delivered.set()
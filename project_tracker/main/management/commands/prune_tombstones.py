@@ -0,0 +1,16 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from main.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete change-feed tombstones older than --days (clients polling from before then must reload).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        count, _ = Tombstone.objects.filter(updated_at__lt=cutoff).delete()
+        self.stdout.write(f'Deleted {count} tombstones.')
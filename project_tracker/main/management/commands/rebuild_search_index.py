@@ -0,0 +1,12 @@
+import time
+from django.core.management.base import BaseCommand
+from main.search import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Repopulate the project full-text search table (main.search) from scratch.'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild()
+        self.stdout.write(f'Indexed {count} projects in {time.perf_counter() - started:.1f}s.')
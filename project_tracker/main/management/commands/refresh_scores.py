@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from main.scoring import refresh_scores
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized CategoryScore summaries for every category.'
+
+    def handle(self, *args, **options):
+        count = refresh_scores()
+        self.stdout.write(f'Refreshed scores for {count} categories.')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from main.seeding import seed
+
+
+class Command(BaseCommand):
+    help = 'Insert synthetic users, statuses, categories and projects (default 10 years x 50 categories x 200 projects).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=10)
+        parser.add_argument('--categories', type=int, default=50, help='Categories per year.')
+        parser.add_argument('--projects', type=int, default=200, help='Projects per category.')
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+
+    def handle(self, *args, **options):
+        counts = seed(options['years'], options['categories'], options['projects'], options['users'],
+                      random_seed=options['seed'])
+        self.stdout.write('Created ' + ', '.join(f'{n} {model}' for model, n in counts.items()) + '.')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from main.digest import DEFAULT_CHUNK_SIZE, DEFAULT_DAYS, send_digest
+
+
+class Command(BaseCommand):
+    help = 'Queue an email to each owner with a digest of their at-risk, delayed and soon-due projects.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='Flag projects due within this many days.')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Owners read and queued per batch.')
+        parser.add_argument('--dry-run', metavar='DIR', help='Write the messages to DIR instead of queuing them.')
+
+    def handle(self, *args, **options):
+        count = send_digest(options['days'], options['chunk_size'], options['dry_run'])
+        verb = 'Wrote' if options['dry_run'] else 'Queued'
+        self.stdout.write(f'{verb} {count} digest messages.')
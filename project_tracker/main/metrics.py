@@ -0,0 +1,206 @@
+"""
+Per-request timing: total duration, SQL query count and time, template time.
+
+MetricsMiddleware opens a RequestTimings for each request in a context
+variable. record_sql() is installed as an execute_wrapper on every database
+connection (see MainConfig.ready) and TimedDjangoTemplates times top-level
+template renders; both add to the current RequestTimings, so work done in
+sync_to_async threads by async views is counted too. At the end of the
+request the totals go out in a Server-Timing header and into per-view
+histograms, rendered in Prometheus text format by render_prometheus().
+
+Histograms are per process: with several workers each one exposes its own.
+"""
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+UNRESOLVED_VIEW = '<unresolved>'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class RequestTimings:
+    __slots__ = ('queries', 'sql', 'template')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+
+
+_current = ContextVar('request_timings', default=None)
+
+
+def record_sql(execute, sql, params, many, context):
+    """connection.execute_wrapper hook: count and time queries of the current request."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.sql += time.perf_counter() - started
+        timings.queries += 1
+
+
+def install_sql_timer(sender, connection, **kwargs):
+    """connection_created receiver that adds record_sql to the new connection."""
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend whose templates report their render time."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class Histogram:
+    """A Prometheus histogram with one `view` label."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}  # view -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = [0] * len(self.buckets) + [0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        with self._lock:
+            snapshot = {view: list(series) for view, series in self._series.items()}
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for view in sorted(snapshot):
+            series = snapshot[view]
+            label = _escape(view)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{view="{label}",le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{view="{label}",le="+Inf"}} {series[-1]}')
+            lines.append(f'{self.name}_sum{{view="{label}"}} {round(series[-2], 6)}')
+            lines.append(f'{self.name}_count{{view="{label}"}} {series[-1]}')
+        return lines
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REQUEST_SECONDS = Histogram(
+    'project_tracker_request_duration_seconds', 'Time spent handling the request.', DURATION_BUCKETS)
+SQL_QUERIES = Histogram(
+    'project_tracker_request_sql_queries', 'SQL queries executed per request.', QUERY_BUCKETS)
+SQL_SECONDS = Histogram(
+    'project_tracker_request_sql_duration_seconds', 'Time spent in SQL per request.', DURATION_BUCKETS)
+TEMPLATE_SECONDS = Histogram(
+    'project_tracker_request_template_duration_seconds', 'Time spent rendering templates per request.',
+    DURATION_BUCKETS)
+HISTOGRAMS = (REQUEST_SECONDS, SQL_QUERIES, SQL_SECONDS, TEMPLATE_SECONDS)
+
+
+def render_prometheus():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+
+
+def server_timing(total, timings):
+    return (
+        f'total;dur={total * 1000:.1f}, '
+        f'db;dur={timings.sql * 1000:.1f};desc="{timings.queries} queries", '
+        f'tpl;dur={timings.template * 1000:.1f}'
+    )
+
+
+class MetricsMiddleware:
+    """
+    Time each request and attach a Server-Timing header. Put it first in
+    MIDDLEWARE so session and auth queries are counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.emit_header = getattr(settings, 'METRICS_SERVER_TIMING', True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, time.perf_counter() - started, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, time.perf_counter() - started, timings)
+
+    def finish(self, request, response, total, timings):
+        match = request.resolver_match
+        view = match.view_name if match is not None else UNRESOLVED_VIEW
+        REQUEST_SECONDS.observe(view, total)
+        SQL_QUERIES.observe(view, timings.queries)
+        SQL_SECONDS.observe(view, timings.sql)
+        TEMPLATE_SECONDS.observe(view, timings.template)
+        if self.emit_header:
+            response['Server-Timing'] = server_timing(total, timings)
+        return response
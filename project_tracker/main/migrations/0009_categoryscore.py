@@ -0,0 +1,32 @@
+# Generated by Django 6.0 on 2026-10-18 11:19
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_alter_project_project_phase_alter_status_status_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryScore',
+            fields=[
+                ('uid', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('scorecard_year', models.IntegerField(db_index=True)),
+                ('project_count', models.IntegerField(default=0)),
+                ('weight_total', models.DecimalField(decimal_places=3, default=0, max_digits=12)),
+                ('score', models.DecimalField(decimal_places=3, default=0, max_digits=12)),
+                ('max_score', models.DecimalField(decimal_places=3, default=0, max_digits=12)),
+                ('category', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_summary', to='main.category')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
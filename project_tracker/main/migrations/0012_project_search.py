@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import migrations
+
+# FTS5 table behind main.search. prefix='2 3' indexes 2- and 3-character
+# prefixes for type-ahead queries; the 'rank' config makes ORDER BY rank use
+# the weighted bm25 from main.search.RANK_WEIGHTS.
+CREATE = [
+    '''CREATE VIRTUAL TABLE main_project_search USING fts5(
+        uid UNINDEXED, project_name, comment, category_name, owner_email, scorecard_year,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )''',
+    "INSERT INTO main_project_search(main_project_search, rank) VALUES ('rank', 'bm25(0.0, 10.0, 1.0, 4.0, 2.0, 0.0)')",
+]
+INSERT = (
+    'INSERT INTO main_project_search(rowid, uid, project_name, comment, category_name, owner_email, scorecard_year) '
+    'VALUES (%s, %s, %s, %s, %s, %s, %s)'
+)
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE:
+        schema_editor.execute(statement)
+    Project = apps.get_model('main', 'Project')
+    rows = Project.objects.values_list(
+        'uid', 'project_name', 'comment', 'category__category_name', 'owner__email', 'category__scorecard_year')
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(INSERT, [
+            (uid.int >> 65, uid.hex, name, comment or '', category_name, email or '', str(year))
+            for uid, name, comment, category_name, email, year in rows.iterator(chunk_size=2000)
+        ])
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS main_project_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_change_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
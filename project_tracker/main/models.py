@@ -2,6 +2,10 @@ import uuid
 from django.db import models
 from users.models import User
 
+# Scorecard years accepted from requests; anything else is a 400, not a query
+MIN_SCORECARD_YEAR = 1900
+MAX_SCORECARD_YEAR = 9999
+
 # Create your models here.
 class Common(models.Model):
     uid=models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -21,6 +25,11 @@ class Category(Common):
     class Meta:
         verbose_name = 'Category'
         verbose_name_plural = 'Categories'
+        indexes = [
+            models.Index(fields=['scorecard_year', 'category_name', 'uid'], name='category_year_name_idx'),
+            models.Index(fields=['category_name', 'uid'], name='category_name_idx'),
+            models.Index(fields=['updated_at', 'uid'], name='category_updated_idx'),
+        ]
     
 class Status(Common):
     status_name = models.CharField(max_length=50, choices= [('Planned', 'Planned'), ('On Track', 'On Track'), ('At Risk', 'At Risk'), ('Delayed', 'Delayed')], default='Not Started', blank=False, null=False)
@@ -38,3 +47,49 @@ class Project(Common):
     owner=models.ForeignKey(User, on_delete=models.CASCADE)
     budget=models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
     comment = models.TextField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'project_status'], name='project_category_status_idx'),
+            models.Index(fields=['category', 'project_name', 'uid'], name='project_category_name_idx'),
+            models.Index(fields=['stretch_target_date'], name='project_target_date_idx'),
+            models.Index(fields=['owner', 'stretch_target_date'], name='project_owner_date_idx'),
+            models.Index(fields=['updated_at', 'uid'], name='project_updated_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so moving a project refreshes both categories' scores
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
+
+class CategoryScore(Common):
+    """Materialized scorecard totals for one category, kept current by main.scoring."""
+    category = models.OneToOneField(Category, on_delete=models.CASCADE, related_name='score_summary')
+    scorecard_year = models.IntegerField(db_index=True)
+    project_count = models.IntegerField(default=0)
+    weight_total = models.DecimalField(max_digits=12, decimal_places=3, default=0)
+    score = models.DecimalField(max_digits=12, decimal_places=3, default=0)
+    max_score = models.DecimalField(max_digits=12, decimal_places=3, default=0)
+
+    def __str__(self):
+        return f'{self.category} ({self.scorecard_year}): {self.score}'
+
+class Tombstone(Common):
+    """Record of a deleted project or category, served by the change feed (main.changes)."""
+    KIND_PROJECT = 'project'
+    KIND_CATEGORY = 'category'
+
+    kind = models.CharField(max_length=10, choices=[(KIND_PROJECT, 'Project'), (KIND_CATEGORY, 'Category')])
+    object_uid = models.UUIDField()
+    category_uid = models.UUIDField(blank=True, null=True)
+    scorecard_year = models.IntegerField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'uid'], name='tombstone_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_uid}'
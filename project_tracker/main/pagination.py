@@ -0,0 +1,110 @@
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    """Encode the ordering values of the last row of a page as an opaque cursor."""
+    raw = json.dumps([str(v) for v in values]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def page_size(request, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Read ?limit= from the request, clamped to [1, maximum]."""
+    raw = request.GET.get('limit')
+    if not raw:
+        return default
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError('Invalid limit')
+    return max(1, min(limit, maximum))
+
+
+def _row_value(row, field):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def _ordering_key(ordering):
+    return ','.join(ordering)
+
+
+def _field(model, path):
+    """The model field at the end of a '__'-separated lookup path."""
+    field = None
+    for name in path.split('__'):
+        field = model._meta.get_field(name)
+        model = field.related_model
+    return field
+
+
+def encode_keyset_cursor(ordering, values):
+    """Cursor resuming a keyset_page with this ordering after the row with these ordering values."""
+    return encode_cursor([_ordering_key(ordering), *values])
+
+
+def decode_keyset_cursor(model, ordering, cursor):
+    """
+    The ordering values in a cursor from encode_keyset_cursor, converted to
+    Python with each field's to_python(). Raises ValueError if the cursor is
+    malformed or was issued for a different ordering (e.g. another ?sort=).
+    """
+    values = decode_cursor(cursor)
+    if len(values) != len(ordering) + 1 or values[0] != _ordering_key(ordering):
+        raise ValueError('Invalid cursor')
+    try:
+        return [_field(model, f.lstrip('-')).to_python(v) for f, v in zip(ordering, values[1:])]
+    except (ValidationError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def keyset_after(ordering, values):
+    """Q selecting the rows that sort strictly after `values` in `ordering`."""
+    # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y); descending fields use <
+    condition = Q()
+    for i, field in enumerate(ordering):
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        term = Q(**{f'{field.lstrip("-")}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            term &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= term
+    return condition
+
+
+def keyset_page(queryset, ordering, cursor, limit):
+    """
+    Return one page of `queryset` ordered by the `ordering` field names
+    ('-name' for descending), starting strictly after `cursor`.
+
+    Rows are located with a WHERE clause on the ordering columns instead of
+    OFFSET, so fetching page N costs the same as fetching page 1.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Raises ValueError for a cursor that does not belong to this ordering.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(keyset_after(ordering, decode_keyset_cursor(queryset.model, ordering, cursor)))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_keyset_cursor(ordering, [_row_value(last, f.lstrip('-')) for f in ordering])
+    return rows, next_cursor
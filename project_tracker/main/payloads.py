@@ -0,0 +1,167 @@
+"""
+Request body decoding for the JSON/form endpoints.
+
+The body is decoded once (JSON or form-encoded) and validated against a
+pydantic schema. Schemas are built when this module is imported, so each
+request only pays for validation. Length and digit limits are read from the
+model fields, so a value the column cannot hold is a 400, not a bad save.
+"""
+import json
+from datetime import date
+from decimal import Decimal
+from functools import wraps
+from typing import Annotated, Literal, Optional
+from uuid import UUID
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponseBadRequest
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, ValidationError
+from .models import MAX_SCORECARD_YEAR, MIN_SCORECARD_YEAR, Category, Project
+
+
+class PayloadError(ValueError):
+    pass
+
+
+def blank_to_none(value):
+    # HTML inputs post '' for untouched fields; treat that as "not provided"
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+PHASES = tuple(value for value, _ in Project._meta.get_field('project_phase').choices)
+
+
+def model_text(model, name):
+    """str limited to the max_length of model field `name`."""
+    return Annotated[str, Field(max_length=model._meta.get_field(name).max_length)]
+
+
+def model_decimal(model, name):
+    """Decimal limited to the max_digits/decimal_places of model field `name`."""
+    field = model._meta.get_field(name)
+    return Annotated[Decimal, Field(max_digits=field.max_digits, decimal_places=field.decimal_places)]
+
+
+def not_bool(value):
+    # JSON true/false would otherwise pass as the integers 1/0
+    if isinstance(value, bool):
+        raise ValueError('Expected an integer')
+    return value
+
+
+def optional(type_):
+    return Annotated[Optional[type_], BeforeValidator(blank_to_none)]
+
+
+def required(type_):
+    return Annotated[type_, BeforeValidator(blank_to_none)]
+
+
+Phase = optional(Literal[PHASES])
+Date = optional(date)
+# Booleans are rejected, numeric strings are not: form posts send "2025"
+Year = optional(Annotated[int, Field(ge=MIN_SCORECARD_YEAR, le=MAX_SCORECARD_YEAR), BeforeValidator(not_bool)])
+Id = optional(UUID)
+
+ProjectName = model_text(Project, 'project_name')
+ProjectWeight = model_decimal(Project, 'measure_initiative_weight')
+Budget = model_decimal(Project, 'budget')
+CategoryName = model_text(Category, 'category_name')
+ObjectiveWeight = model_decimal(Category, 'objective_weight')
+
+
+class Payload(BaseModel):
+    model_config = ConfigDict(extra='ignore', str_strip_whitespace=True, frozen=True)
+
+
+class ProjectUpdate(Payload):
+    project_name: optional(ProjectName) = None
+    project_phase: Phase = None
+    stretch_target_date: Date = None
+    budget: optional(Budget) = None
+    measure_initiative_weight: optional(ProjectWeight) = None
+    owner_id: Id = None
+    project_status_id: Id = None
+    # '' is a real value here: it clears the comment
+    comment: Optional[str] = None
+
+
+class ProjectCreate(Payload):
+    project_name: required(ProjectName)
+    project_phase: Annotated[Literal[PHASES], BeforeValidator(lambda v: blank_to_none(v) or 'Requirement')] = 'Requirement'
+    stretch_target_date: required(date)
+    project_status_id: required(UUID)
+    owner_id: required(UUID)
+    budget: optional(Budget) = None
+    measure_initiative_weight: optional(ProjectWeight) = None
+    comment: Optional[str] = None
+
+
+class CategoryUpdate(Payload):
+    category_name: optional(CategoryName) = None
+    objective_weight: optional(ObjectiveWeight) = None
+    scorecard_year: Year = None
+
+
+class CategoryCreate(Payload):
+    category_name: required(CategoryName)
+    objective_weight: optional(ObjectiveWeight) = None
+    scorecard_year: Year = None
+
+
+def _error_message(exc):
+    error = exc.errors()[0]
+    field = '.'.join(str(part) for part in error['loc']) or 'payload'
+    if error['type'] == 'missing' or error.get('input') is None:
+        return f'{field} is required'
+    return f'Invalid {field}'
+
+
+def decode_body(request):
+    """Decode the request body into a dict, once. Raises PayloadError."""
+    if request.content_type in ('application/x-www-form-urlencoded', 'multipart/form-data'):
+        return request.POST.dict()
+    try:
+        data = json.loads(request.body.decode('utf-8')) if request.body else {}
+    except (UnicodeDecodeError, ValueError):
+        raise PayloadError('Invalid JSON payload')
+    if not isinstance(data, dict):
+        raise PayloadError('Invalid JSON payload')
+    return data
+
+
+def validate(schema, data):
+    """Validate an already decoded dict against schema. Raises PayloadError."""
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        raise PayloadError(_error_message(e))
+
+
+def parse_body(request, schema):
+    return validate(schema, decode_body(request))
+
+
+def validated_body(schema):
+    """View decorator passing the validated body as the `payload` keyword argument."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                try:
+                    payload = parse_body(request, schema)
+                except PayloadError as e:
+                    return HttpResponseBadRequest(str(e))
+                return await view(request, *args, payload=payload, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                payload = parse_body(request, schema)
+            except PayloadError as e:
+                return HttpResponseBadRequest(str(e))
+            return view(request, *args, payload=payload, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,91 @@
+"""
+In-process registry of small reference tables: statuses, phase choices and
+owners.
+
+The registry is rebuilt in each process when the shared 'reference' data
+version (main.cache) changes; main.signals bumps it whenever a Status or
+User is saved or deleted. The dashboard render and the update/create views
+read from it, so validating a status or owner id is usually a dict lookup.
+The bump only lands after the writer commits, so a row created moments ago
+(or in another worker) can be missing from a registry; statuses_for() and
+owners_for() look such ids up in the database, and a hit drops the stale
+registry so the next call rebuilds it. The instances it holds are shared
+across requests and must be treated as read-only: assign them to foreign
+keys, never save them.
+"""
+import threading
+from .cache import bump_version, data_version
+from .models import Project, Status
+from users.models import User
+
+REFERENCE_SCOPE = 'reference'
+OWNER_FIELDS = ('uid', 'email', 'first_name', 'last_name')
+
+
+class ReferenceData:
+
+    def __init__(self, version):
+        self.version = version
+        self.statuses = list(Status.objects.only('uid', 'status_name'))
+        self.status_by_id = {s.uid: s for s in self.statuses}
+        self.owners = list(User.objects.order_by('email').only(*OWNER_FIELDS))
+        self.owner_by_id = {u.uid: u for u in self.owners}
+        self.phases = list(Project._meta.get_field('project_phase').choices or [])
+
+    def statuses_for(self, uids):
+        """status uid -> Status for those of uids that exist."""
+        return self._resolve(self.status_by_id, Status.objects.only('uid', 'status_name'), uids)
+
+    def owners_for(self, uids):
+        """owner uid -> User for those of uids that exist."""
+        return self._resolve(self.owner_by_id, User.objects.only(*OWNER_FIELDS), uids)
+
+    def _resolve(self, known, queryset, uids):
+        found = {uid: known[uid] for uid in uids if uid in known}
+        missing = set(uids) - found.keys()
+        if missing:
+            fresh = queryset.in_bulk(missing)
+            if fresh:
+                _discard(self)
+            found.update(fresh)
+        return found
+
+    def owner_names(self):
+        """owner uid -> display name."""
+        return {u.uid: f'{u.first_name} {u.last_name}'.strip() or u.email for u in self.owners}
+
+
+_lock = threading.Lock()
+_current = None
+
+
+def get_reference():
+    """The registry for the current reference version, rebuilding it if stale."""
+    global _current
+    version = data_version(REFERENCE_SCOPE)
+    registry = _current
+    if registry is not None and registry.version == version:
+        return registry
+    with _lock:
+        if _current is None or _current.version != version:
+            _current = ReferenceData(version)
+        return _current
+
+
+def _discard(registry):
+    global _current
+    with _lock:
+        if _current is registry:
+            _current = None
+
+
+def invalidate():
+    bump_version(REFERENCE_SCOPE)
+
+
+def get_status(uid):
+    return get_reference().statuses_for([uid]).get(uid)
+
+
+def get_owner(uid):
+    return get_reference().owners_for([uid]).get(uid)
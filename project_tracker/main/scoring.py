@@ -0,0 +1,102 @@
+"""
+Scorecard score engine.
+
+A project contributes objective_weight x measure_initiative_weight x
+attainment, where attainment comes from its status name
+(settings.SCORECARD_ATTAINMENT).
+
+Per-category totals are computed in the database with one grouped query and
+upserted into CategoryScore. Signals (main.signals) refresh only the
+categories touched by a save; refresh_scores() with no arguments rebuilds
+everything.
+"""
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, Sum, Value, When
+from django.db.models.functions import Coalesce
+from .models import Category, CategoryScore
+
+SCORE_FIELD = DecimalField(max_digits=12, decimal_places=3)
+ZERO = Value(Decimal('0'), output_field=SCORE_FIELD)
+
+
+def attainment_expression(prefix=''):
+    """CASE expression mapping a project's status name to its attainment factor."""
+    whens = [
+        When(**{f'{prefix}project_status__status_name': name}, then=Value(Decimal(str(factor))))
+        for name, factor in settings.SCORECARD_ATTAINMENT.items()
+    ]
+    return Case(*whens, default=ZERO, output_field=SCORE_FIELD)
+
+
+def category_totals(categories):
+    """Annotate a Category queryset with project_count, weight_total, score and max_score."""
+    weight = F('project__measure_initiative_weight')
+    weight_total = Coalesce(Sum(weight, output_field=SCORE_FIELD), ZERO)
+    achieved = Coalesce(Sum(weight * attainment_expression('project__'), output_field=SCORE_FIELD), ZERO)
+    return categories.annotate(
+        project_count=Count('project'),
+        weight_total=weight_total,
+        score=ExpressionWrapper(F('objective_weight') * achieved, output_field=SCORE_FIELD),
+        max_score=ExpressionWrapper(F('objective_weight') * weight_total, output_field=SCORE_FIELD),
+    )
+
+
+def _quantize(value):
+    return Decimal(value or 0).quantize(Decimal('0.001'))
+
+
+def refresh_scores(category_ids=None):
+    """
+    Recompute and store the scores of the given categories (all when None).
+    Returns the number of categories refreshed.
+    """
+    categories = Category.objects.all()
+    if category_ids is not None:
+        category_ids = {c for c in category_ids if c}
+        if not category_ids:
+            return 0
+        categories = categories.filter(uid__in=category_ids)
+    rows = category_totals(categories).values_list(
+        'uid', 'scorecard_year', 'project_count', 'weight_total', 'score', 'max_score')
+    scores = [
+        CategoryScore(
+            category_id=uid, scorecard_year=year, project_count=count,
+            weight_total=_quantize(weight_total), score=_quantize(score), max_score=_quantize(max_score),
+        )
+        for uid, year, count, weight_total, score, max_score in rows
+    ]
+    with transaction.atomic():
+        CategoryScore.objects.bulk_create(
+            scores,
+            update_conflicts=True,
+            unique_fields=['category'],
+            update_fields=['scorecard_year', 'project_count', 'weight_total', 'score', 'max_score', 'updated_at'],
+        )
+    return len(scores)
+
+
+def year_scorecard(year):
+    """Read a year's scorecard from the materialized summaries; the year totals are summed in SQL."""
+    summaries = CategoryScore.objects.filter(scorecard_year=year)
+    totals = summaries.aggregate(
+        score=Coalesce(Sum('score'), ZERO),
+        max_score=Coalesce(Sum('max_score'), ZERO),
+    )
+    scores = summaries.select_related('category').order_by('category__category_name')
+    categories = [{
+        'category_id': str(s.category_id),
+        'category_name': s.category.category_name,
+        'objective_weight': str(s.category.objective_weight),
+        'project_count': s.project_count,
+        'weight_total': str(s.weight_total),
+        'score': str(s.score),
+        'max_score': str(s.max_score),
+    } for s in scores]
+    return {
+        'scorecard_year': year,
+        'score': str(_quantize(totals['score'])),
+        'max_score': str(_quantize(totals['max_score'])),
+        'categories': categories,
+    }
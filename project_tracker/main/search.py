@@ -0,0 +1,151 @@
+"""
+Full-text search over projects with SQLite FTS5.
+
+main_project_search (migration 0012) holds one row per project: its name,
+comment, category name and owner email, which free text is matched
+against; its category's scorecard year, matched only by ?year= filters; and
+the project uid (stored, not indexed). The row's rowid is derived from the uid (search_rowid), so a
+project's entry is found without scanning the table and survives the table
+rebuilds and VACUUMs that renumber main_project's own rowids.
+
+main.signals keeps the table in sync incrementally: saved, bulk-saved and
+deleted projects are re-indexed or removed, and renaming a category or
+changing a user's email re-indexes their projects. rebuild() repopulates it
+from scratch (`manage.py rebuild_search_index`), e.g. after rows were
+written with queryset.update() or raw SQL, which send no signals.
+"""
+import re
+import uuid
+from django.db import connection, transaction
+from .models import Project
+
+SEARCH_TABLE = 'main_project_search'
+# bm25 weights for uid, project_name, comment, category_name, owner_email, scorecard_year
+RANK_WEIGHTS = (0.0, 10.0, 1.0, 4.0, 2.0, 0.0)
+TEXT_COLUMNS = ('project_name', 'comment', 'category_name', 'owner_email')
+# The final term of a query shorter than this is matched whole, not as a prefix
+MIN_PREFIX_LENGTH = 2
+# Projects indexed per statement batch (keeps uid__in under SQLite's variable limit)
+BATCH_SIZE = 500
+
+INDEXED_FIELDS = (
+    'uid', 'project_name', 'comment', 'category__category_name', 'owner__email', 'category__scorecard_year')
+INSERT_SQL = (
+    f'INSERT INTO {SEARCH_TABLE}(rowid, uid, project_name, comment, category_name, owner_email, scorecard_year) '
+    'VALUES (%s, %s, %s, %s, %s, %s, %s)'
+)
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def enabled():
+    return connection.vendor == 'sqlite'
+
+
+def search_rowid(uid):
+    """The search table rowid of project `uid`: its top 63 bits, so it fits a signed 64-bit rowid."""
+    return uid.int >> 65
+
+
+def _entries(rows):
+    for uid, name, comment, category_name, owner_email, year in rows:
+        yield search_rowid(uid), uid.hex, name, comment or '', category_name, owner_email or '', str(year)
+
+
+def _delete(cursor, uids):
+    cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(search_rowid(uid),) for uid in uids])
+
+
+def index_projects(uids):
+    """(Re)index the projects with these uids; uids that no longer exist are removed."""
+    if not enabled():
+        return
+    uids = list(uids)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(uids), BATCH_SIZE):
+            batch = uids[start:start + BATCH_SIZE]
+            _delete(cursor, batch)
+            rows = Project.objects.filter(uid__in=batch).values_list(*INDEXED_FIELDS)
+            cursor.executemany(INSERT_SQL, list(_entries(rows)))
+
+
+def unindex_projects(uids):
+    if not enabled():
+        return
+    with connection.cursor() as cursor:
+        _delete(cursor, uids)
+
+
+def match_expression(query, year=None):
+    """
+    FTS5 MATCH expression for free text: every word must match one of
+    TEXT_COLUMNS, and the last one also matches as a prefix so results
+    follow typing. With `year`, only that scorecard year matches. Returns
+    None when the query has no words. Words are quoted, so FTS5 operators
+    in the input are searched for literally.
+    """
+    terms = _TERM.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    if len(terms[-1]) >= MIN_PREFIX_LENGTH:
+        quoted[-1] += '*'
+    expression = '{' + ' '.join(TEXT_COLUMNS) + '} : (' + ' '.join(quoted) + ')'
+    if year is not None:
+        expression += f' AND scorecard_year : "{int(year)}"'
+    return expression
+
+
+def search(query, year=None, after=None, limit=25):
+    """
+    (uid hex, rank) of the projects matching `query`, best first, optionally
+    only in scorecard `year`. Lower ranks are better (FTS5 bm25 convention).
+
+    Every match is ranked, so the first page is the best of all matches,
+    however many there are. Ties in rank are broken by rowid; pass the
+    (rank, rowid) of the last row of a page as `after` to continue after it
+    (see search_cursor()) without repeats or gaps.
+    """
+    expression = match_expression(query, year)
+    if expression is None or not enabled():
+        return []
+    sql = f'SELECT uid, rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+    params = [expression]
+    if after is not None:
+        rank, rowid = after
+        sql += ' AND (rank > %s OR (rank = %s AND rowid > %s))'
+        params += [rank, rank, rowid]
+    with connection.cursor() as cursor:
+        cursor.execute(f'{sql} ORDER BY rank, rowid LIMIT %s', [*params, limit])
+        return cursor.fetchall()
+
+
+def search_cursor(row):
+    """The `after` position following a (uid hex, rank) row returned by search()."""
+    uid, rank = row
+    return rank, search_rowid(uuid.UUID(uid))
+
+
+def configure(cursor):
+    weights = ', '.join(str(w) for w in RANK_WEIGHTS)
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', 'bm25({weights})')")
+
+
+def rebuild():
+    """Repopulate the search table from the project, category and user tables. Returns the row count."""
+    count = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        configure(cursor)
+        rows = Project.objects.order_by().values_list(*INDEXED_FIELDS).iterator(chunk_size=2000)
+        batch = []
+        for entry in _entries(rows):
+            batch.append(entry)
+            if len(batch) >= 2000:
+                cursor.executemany(INSERT_SQL, batch)
+                count += len(batch)
+                batch = []
+        cursor.executemany(INSERT_SQL, batch)
+        count += len(batch)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+    return count
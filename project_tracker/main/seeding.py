@@ -0,0 +1,79 @@
+"""
+Synthetic scorecard data for benchmarks and local load testing.
+
+seed() bulk-inserts users, statuses, categories and projects in fixed-size
+batches, then rebuilds the materialized scores and the search table once,
+so seeding 100k projects costs a few hundred queries rather than one per
+row. Values come
+from a seeded random.Random, so two runs with the same arguments produce
+the same shape of data.
+"""
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from users.models import User
+from .cache import bump_version
+from .models import Category, Project, Status
+from .reference import invalidate as invalidate_reference
+from .scoring import refresh_scores
+from .search import rebuild as rebuild_search
+
+STATUS_NAMES = ('Planned', 'On Track', 'At Risk', 'Delayed', 'Completed')
+PHASES = tuple(value for value, _ in Project._meta.get_field('project_phase').choices)
+
+
+def seed(years=10, categories=50, projects=200, users=50, first_year=None, batch_size=1000, random_seed=0):
+    """
+    Insert `years` x `categories` categories with `projects` projects each,
+    owned by `users` users. Returns the number of rows created per model.
+    """
+    rng = random.Random(random_seed)
+    first_year = first_year or date.today().year - years + 1
+
+    statuses = [Status.objects.get_or_create(status_name=name)[0] for name in STATUS_NAMES]
+    # Seed users from an earlier run are reused, so seeding again adds data instead of failing
+    emails = [f'seed-user-{i}@example.com' for i in range(users)]
+    existing = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+    new_users = User.objects.bulk_create([
+        User(email=email, username=email, first_name=f'Seed{i}', last_name='User', password='!')
+        for i, email in enumerate(emails) if email not in existing
+    ], batch_size=batch_size)
+    by_email = User.objects.in_bulk(emails, field_name='email')
+    owners = [by_email[email] for email in emails]
+
+    category_rows = Category.objects.bulk_create([
+        Category(category_name=f'Objective {c:03d}', scorecard_year=first_year + y,
+                 objective_weight=Decimal(rng.randint(5, 50)) / 10)
+        for y in range(years) for c in range(categories)
+    ], batch_size=batch_size)
+
+    created = 0
+    batch = []
+    for category in category_rows:
+        start = date(category.scorecard_year, 1, 1)
+        for p in range(projects):
+            batch.append(Project(
+                project_name=f'{category.category_name} project {p:04d}',
+                category=category,
+                measure_initiative_weight=Decimal(rng.randint(1, 50)) / 10,
+                project_phase=rng.choice(PHASES),
+                project_status=rng.choice(statuses),
+                stretch_target_date=start + timedelta(days=rng.randint(0, 364)),
+                owner=rng.choice(owners),
+                budget=Decimal(rng.randint(1000, 5_000_000)) / 100,
+                comment='' if rng.random() < 0.5 else f'Seeded comment {p}',
+            ))
+            if len(batch) >= batch_size:
+                Project.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+    if batch:
+        Project.objects.bulk_create(batch)
+        created += len(batch)
+
+    # bulk_create skips the signals that normally keep these current
+    refresh_scores()
+    rebuild_search()
+    bump_version()
+    invalidate_reference()
+    return {'users': len(new_users), 'statuses': len(statuses), 'categories': len(category_rows), 'projects': created}
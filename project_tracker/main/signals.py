@@ -0,0 +1,185 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal
+from users.models import User
+from .models import Category, Project, Status, Tombstone
+from . import events, search
+from .cache import bump_version, category_scope
+from .reference import invalidate as invalidate_reference
+from .scoring import refresh_scores
+
+# Changes to these invalidate every cached dashboard payload; project changes
+# only invalidate their category's project pages.
+DASHBOARD_MODELS = (Category, Status, User)
+
+# Sent after bulk_create/bulk_update of projects, which bypass post_save.
+# Receivers get the saved instances as `projects`.
+projects_bulk_saved = Signal()
+
+
+def _login_bookkeeping(sender, kwargs):
+    # login() saves last_login with update_fields; that changes nothing shown
+    update_fields = kwargs.get('update_fields')
+    return sender is User and update_fields is not None and set(update_fields) <= {'last_login'}
+
+
+def invalidate_dashboard_cache(sender, **kwargs):
+    if not _login_bookkeeping(sender, kwargs):
+        bump_version()
+
+
+def invalidate_reference_data(sender, **kwargs):
+    if not _login_bookkeeping(sender, kwargs):
+        invalidate_reference()
+
+
+def _project_category_ids(projects):
+    category_ids = set()
+    for project in projects:
+        category_ids.add(project.category_id)
+        category_ids.add(getattr(project, '_loaded_category_id', None))
+    category_ids.discard(None)
+    return category_ids
+
+
+def invalidate_project_cache(sender, instance, **kwargs):
+    for category_id in _project_category_ids([instance]):
+        bump_version(category_scope(category_id))
+
+
+def invalidate_bulk_project_cache(sender, projects, **kwargs):
+    for category_id in _project_category_ids(projects):
+        bump_version(category_scope(category_id))
+
+
+for model in DASHBOARD_MODELS:
+    post_save.connect(invalidate_dashboard_cache, sender=model, dispatch_uid=f'dashboard_save_{model.__name__}')
+    post_delete.connect(invalidate_dashboard_cache, sender=model, dispatch_uid=f'dashboard_delete_{model.__name__}')
+for model in (Status, User):
+    post_save.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference_save_{model.__name__}')
+    post_delete.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference_delete_{model.__name__}')
+post_save.connect(invalidate_project_cache, sender=Project, dispatch_uid='dashboard_save_Project')
+post_delete.connect(invalidate_project_cache, sender=Project, dispatch_uid='dashboard_delete_Project')
+projects_bulk_saved.connect(invalidate_bulk_project_cache, dispatch_uid='dashboard_bulk_projects')
+
+
+def refresh_project_scores(sender, instance, **kwargs):
+    origin = kwargs.get('origin')
+    if origin is not None and getattr(origin, 'model', type(origin)) is Category:
+        # The category itself is being deleted; its summary goes with it
+        return
+    refresh_scores(_project_category_ids([instance]))
+
+
+def refresh_category_score(sender, instance, **kwargs):
+    refresh_scores({instance.uid})
+
+
+def refresh_bulk_project_scores(sender, projects, **kwargs):
+    refresh_scores(_project_category_ids(projects))
+
+
+def refresh_all_scores(sender, **kwargs):
+    # A renamed status can change the attainment of any category
+    refresh_scores()
+
+
+post_save.connect(refresh_project_scores, sender=Project, dispatch_uid='score_project_save')
+post_delete.connect(refresh_project_scores, sender=Project, dispatch_uid='score_project_delete')
+post_save.connect(refresh_category_score, sender=Category, dispatch_uid='score_category_save')
+post_save.connect(refresh_all_scores, sender=Status, dispatch_uid='score_status_save')
+post_delete.connect(refresh_all_scores, sender=Status, dispatch_uid='score_status_delete')
+projects_bulk_saved.connect(refresh_bulk_project_scores, dispatch_uid='score_bulk_projects')
+
+
+def record_project_tombstone(sender, instance, **kwargs):
+    origin = kwargs.get('origin')
+    if getattr(origin, 'model', type(origin)) is Category and not isinstance(origin, QuerySet):
+        # Cascade from one category's delete; no need to look the year up per project
+        year = origin.scorecard_year
+    else:
+        # Also for a category queryset delete, which may span years: the
+        # categories are only deleted after their projects
+        year = Category.objects.filter(uid=instance.category_id).values_list('scorecard_year', flat=True).first()
+    Tombstone.objects.create(
+        kind=Tombstone.KIND_PROJECT, object_uid=instance.uid, category_uid=instance.category_id, scorecard_year=year,
+    )
+
+
+def record_category_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        kind=Tombstone.KIND_CATEGORY, object_uid=instance.uid, category_uid=instance.uid,
+        scorecard_year=instance.scorecard_year,
+    )
+
+
+# Deletions are fed to the change feed (main.changes) as tombstones
+post_delete.connect(record_project_tombstone, sender=Project, dispatch_uid='tombstone_project')
+post_delete.connect(record_category_tombstone, sender=Category, dispatch_uid='tombstone_category')
+
+
+def _publish_on_commit(event):
+    transaction.on_commit(lambda: events.publish(event))
+
+
+def publish_project_saved(sender, instance, **kwargs):
+    _publish_on_commit(events.make_event('project', instance.uid, instance.category_id))
+
+
+def publish_bulk_projects_saved(sender, projects, **kwargs):
+    # One event per batch; clients fetch the rows themselves from the change feed
+    if projects:
+        _publish_on_commit(events.make_batch_event('projects', _project_category_ids(projects), len(projects)))
+
+
+def publish_project_deleted(sender, instance, **kwargs):
+    _publish_on_commit(events.make_event('project_deleted', instance.uid, instance.category_id))
+
+
+def publish_category_saved(sender, instance, **kwargs):
+    _publish_on_commit(events.make_event('category', instance.uid, instance.uid, instance.scorecard_year))
+
+
+def publish_category_deleted(sender, instance, **kwargs):
+    _publish_on_commit(events.make_event('category_deleted', instance.uid, instance.uid, instance.scorecard_year))
+
+
+# Pushed to connected dashboards through main.events
+post_save.connect(publish_project_saved, sender=Project, dispatch_uid='events_project_save')
+post_delete.connect(publish_project_deleted, sender=Project, dispatch_uid='events_project_delete')
+projects_bulk_saved.connect(publish_bulk_projects_saved, dispatch_uid='events_bulk_projects')
+post_save.connect(publish_category_saved, sender=Category, dispatch_uid='events_category_save')
+post_delete.connect(publish_category_deleted, sender=Category, dispatch_uid='events_category_delete')
+
+
+def index_saved_project(sender, instance, **kwargs):
+    search.index_projects([instance.uid])
+
+
+def index_bulk_projects(sender, projects, **kwargs):
+    search.index_projects([project.uid for project in projects])
+
+
+def unindex_deleted_project(sender, instance, **kwargs):
+    search.unindex_projects([instance.uid])
+
+
+def reindex_category_projects(sender, instance, created, **kwargs):
+    # The category name is indexed with each of its projects
+    if not created:
+        search.index_projects(Project.objects.filter(category_id=instance.uid).values_list('uid', flat=True))
+
+
+def reindex_owner_projects(sender, instance, created, **kwargs):
+    # The owner email is indexed with each of their projects
+    if not created and not _login_bookkeeping(sender, kwargs):
+        search.index_projects(Project.objects.filter(owner_id=instance.pk).values_list('uid', flat=True))
+
+
+# Keep the full-text search table (main.search) in step with its sources
+post_save.connect(index_saved_project, sender=Project, dispatch_uid='search_project_save')
+projects_bulk_saved.connect(index_bulk_projects, dispatch_uid='search_bulk_projects')
+post_delete.connect(unindex_deleted_project, sender=Project, dispatch_uid='search_project_delete')
+post_save.connect(reindex_category_projects, sender=Category, dispatch_uid='search_category_save')
+post_save.connect(reindex_owner_projects, sender=User, dispatch_uid='search_user_save')
@@ -0,0 +1,40 @@
+"""
+Per-connection SQLite tuning.
+
+apply_pragmas() is connected to connection_created in MainConfig.ready() and
+runs the PRAGMAs from settings.SQLITE_PRAGMAS on every new SQLite
+connection. WAL lets dashboard reads proceed while a project save is being
+written, and busy_timeout makes a blocked writer wait instead of failing
+with "database is locked".
+"""
+from django.conf import settings
+
+# PRAGMA name -> value, in the order they must be applied (journal_mode first)
+PRAGMA_ORDER = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store', 'foreign_keys')
+
+
+def pragma_statements(pragmas):
+    ordered = sorted(pragmas.items(), key=lambda item: PRAGMA_ORDER.index(item[0]) if item[0] in PRAGMA_ORDER else len(PRAGMA_ORDER))
+    return [f'PRAGMA {name}={value}' for name, value in ordered if value not in (None, '')]
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(pragmas):
+            cursor.execute(statement)
+
+
+def current_pragmas(connection):
+    """The effective value of each tuned PRAGMA on `connection` (for diagnostics)."""
+    values = {}
+    with connection.cursor() as cursor:
+        for name in PRAGMA_ORDER:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
@@ -1,3 +1,528 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib.util import find_spec
+from unittest import skipUnless
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from users.models import User
+from . import events, metrics, reference
+from .cache import bump_version, get_or_build, stats as cache_stats
+from .changes import change_page
+from .digest import build_messages
+from .exporter import iter_csv, iter_parquet
+from .importer import import_projects, read_csv
+from .models import Category, Project, Status, Tombstone
+from .pagination import encode_cursor
+from .views import project_queryset
 
-# Create your tests here.
+
+class ProjectTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner@example.com', first_name='Ann', last_name='Lee', is_staff=True)
+        self.status = Status.objects.create(status_name='On Track')
+        self.category = Category.objects.create(category_name='Growth', objective_weight=Decimal('5.0'), scorecard_year=2025)
+        self.client.force_login(self.user)
+        # The registry and dashboard cache may still hold rows from an earlier
+        # test; version bumps run on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            reference.invalidate()
+            bump_version()
+
+    def make_projects(self, count, prefix='Project'):
+        return [
+            Project.objects.create(
+                project_name=f'{prefix} {i:02d}', category=self.category, project_status=self.status,
+                owner=self.user, measure_initiative_weight=Decimal('1.0'), stretch_target_date=date(2025, 6, 30),
+            )
+            for i in range(count)
+        ]
+
+
+class BulkTests(ProjectTestCase):
+
+    def post_bulk(self, creates, updates):
+        body = json.dumps({'create': creates, 'update': updates})
+        return self.client.post(reverse('project_bulk'), body, content_type='application/json')
+
+    def batch(self, count):
+        creates = [{
+            'category_id': str(self.category.uid), 'project_name': f'New {i}', 'project_status_id': str(self.status.uid),
+            'owner_id': str(self.user.uid), 'stretch_target_date': '2025-09-30',
+        } for i in range(count)]
+        updates = [{'uid': str(p.uid), 'comment': 'bulk', 'owner_id': str(self.user.uid)} for p in self.projects[:count]]
+        return creates, updates
+
+    def setUp(self):
+        super().setUp()
+        self.projects = self.make_projects(20)
+        # Loads the session, the user and the reference registry
+        self.post_bulk(*self.batch(1))
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        with CaptureQueriesContext(connection) as small:
+            response = self.post_bulk(*self.batch(2))
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(len(small)):
+            response = self.post_bulk(*self.batch(20))
+        self.assertTrue(all(r['ok'] for r in response.json()['results']))
+        self.assertEqual(Project.objects.filter(comment='bulk').count(), 20)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        creates, updates = self.batch(1)
+        creates.append({**creates[0], 'owner_id': '00000000-0000-0000-0000-000000000001'})
+        results = self.post_bulk(creates, updates).json()['results']
+        self.assertEqual([r['ok'] for r in results], [True, False, True])
+        self.assertEqual(results[1]['error'], 'Owner not found')
+        # One from setUp, one from this batch; the invalid copy was not written
+        self.assertEqual(Project.objects.filter(project_name='New 0').count(), 2)
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.post_bulk(*self.batch(1))
+        self.assertEqual(response.status_code, 302)
+        # Only setUp's row was created
+        self.assertEqual(Project.objects.filter(project_name='New 0').count(), 1)
+
+
+class BatchTests(ProjectTestCase):
+
+    def test_projects_in_request_order_with_missing(self):
+        first, second = self.make_projects(2)
+        unknown = '00000000-0000-0000-0000-000000000001'
+        data = self.client.get(reverse('project_batch'), {'uids': f'{second.uid},{unknown},{first.uid}'}).json()
+        self.assertEqual([p['uid'] for p in data['projects']], [str(second.uid), str(first.uid)])
+        self.assertEqual(data['missing'], [unknown])
+
+    def test_login_required(self):
+        project, = self.make_projects(1)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('project_batch'), {'uids': str(project.uid)}).status_code, 302)
+
+
+class KeysetPaginationTests(ProjectTestCase):
+
+    def pages(self, url, params, key='projects', column=None):
+        names, cursor = [], None
+        while True:
+            response = self.client.get(url, {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            names += data[key][column] if column else [p['project_name'] for p in data[key]]
+            cursor = data['next_cursor']
+            if cursor is None:
+                return names
+
+    def test_dashboard_pages_cover_every_category_once(self):
+        for name in ('Delta', 'Alpha', 'Echo', 'Charlie', 'Bravo'):
+            Category.objects.create(category_name=name, objective_weight=Decimal('1.0'), scorecard_year=2025)
+        self.make_projects(3)
+        url = reverse('dashboard_data')
+        names = self.pages(url, {'year': 2025, 'limit': 2}, 'categories', 'category_name')
+        self.assertEqual(names, ['Alpha', 'Bravo', 'Charlie', 'Delta', 'Echo', 'Growth'])
+        projects = self.pages(url, {'year': 2025, 'limit': 2}, 'projects', 'project_name')
+        self.assertEqual(projects, [f'Project {i:02d}' for i in range(3)])
+
+    def test_query_pages_follow_the_sort(self):
+        self.make_projects(5)
+        names = self.pages(reverse('project_query'), {'sort': '-project_name', 'limit': 2})
+        self.assertEqual(names, [f'Project {i:02d}' for i in reversed(range(5))])
+
+    def test_malformed_cursor_is_rejected(self):
+        response = self.client.get(reverse('dashboard_data'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_from_another_sort_is_rejected(self):
+        self.make_projects(3)
+        cursor = self.client.get(reverse('project_query'), {'sort': 'project_name', 'limit': 1}).json()['next_cursor']
+        response = self.client.get(reverse('project_query'), {'sort': '-updated_at', 'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+
+
+class ChangeFeedTests(ProjectTestCase):
+
+    def read_all(self, since, limit=200):
+        """Follow has_more to the end of the feed; returns (uids per change, final cursor)."""
+        uids, has_more = [], True
+        while has_more:
+            changes, since, has_more = change_page(project_queryset(), since, limit)
+            uids += [str(row.uid) for kind, row in changes if kind == 'project']
+        return uids, since
+
+    def an_hour_ago(self):
+        return timezone.now() - timedelta(hours=1)
+
+    def test_pages_return_each_change_once(self):
+        projects = self.make_projects(5)
+        Project.objects.update(updated_at=self.an_hour_ago())
+        uids, _ = self.read_all((self.an_hour_ago() - timedelta(minutes=1)).isoformat(), limit=2)
+        self.assertEqual(sorted(uids), sorted(str(p.uid) for p in projects))
+
+    def test_caught_up_cursor_skips_old_changes(self):
+        self.make_projects(3)
+        Project.objects.update(updated_at=self.an_hour_ago())
+        _, cursor = self.read_all((self.an_hour_ago() - timedelta(minutes=1)).isoformat())
+        self.assertEqual(self.read_all(cursor)[0], [])
+
+    def test_late_commit_within_overlap_is_delivered(self):
+        project, = self.make_projects(1)
+        Project.objects.update(updated_at=self.an_hour_ago())
+        _, cursor = self.read_all(timezone.now().isoformat())
+        # A writer that stamped updated_at a few seconds ago and only commits now
+        Project.objects.filter(uid=project.uid).update(updated_at=timezone.now() - timedelta(seconds=3))
+        self.assertEqual(self.read_all(cursor)[0], [str(project.uid)])
+
+    def test_deleted_project_is_reported(self):
+        project, = self.make_projects(1)
+        uid = str(project.uid)
+        since = timezone.now().isoformat()
+        project.delete()
+        data = self.client.get(reverse('project_changes'), {'since': since}).json()
+        self.assertEqual([d['uid'] for d in data['deleted']], [uid])
+        self.assertEqual(data['projects'], [])
+
+    def test_cascaded_deletes_record_the_category_year(self):
+        older = Category.objects.create(category_name='Legacy', objective_weight=Decimal('1.0'), scorecard_year=2024)
+        project, = self.make_projects(1)
+        Project.objects.create(
+            project_name='Old', category=older, project_status=self.status, owner=self.user,
+            measure_initiative_weight=Decimal('1.0'), stretch_target_date=date(2024, 6, 30),
+        )
+        current = self.category.uid
+        self.category.delete()
+        Category.objects.filter(uid=older.uid).delete()
+        years = dict(Tombstone.objects.filter(kind=Tombstone.KIND_PROJECT).values_list('category_uid', 'scorecard_year'))
+        self.assertEqual(years, {current: 2025, older.uid: 2024})
+
+    def test_since_is_required(self):
+        self.assertEqual(self.client.get(reverse('project_changes')).status_code, 400)
+
+
+class DigestTests(ProjectTestCase):
+
+    def test_every_owner_is_read_in_one_query(self):
+        other = User.objects.create_user('other@example.com')
+        self.make_projects(3)
+        Project.objects.create(
+            project_name='Theirs', category=self.category, project_status=self.status, owner=other,
+            measure_initiative_weight=Decimal('1.0'), stretch_target_date=date(2025, 6, 30),
+        )
+        with self.assertNumQueries(1):
+            messages = list(build_messages(days=30, today=date(2025, 6, 15), chunk_size=2))
+        self.assertEqual(sorted(m['to_email'] for m in messages), ['other@example.com', 'owner@example.com'])
+
+
+class SearchTests(ProjectTestCase):
+
+    def names(self, params):
+        names, cursor = [], None
+        while True:
+            data = self.client.get(reverse('project_search'), {**params, **({'cursor': cursor} if cursor else {})}).json()
+            names += [p['project_name'] for p in data['projects']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                return names
+
+    def test_pages_rank_every_match(self):
+        for project in self.make_projects(6):
+            project.comment = 'zephyr'
+            project.save()
+        best, = self.make_projects(1, prefix='Zephyr')
+        names = self.names({'q': 'zephyr', 'limit': 2})
+        self.assertEqual(names[0], best.project_name)
+        self.assertEqual(sorted(names[1:]), [f'Project {i:02d}' for i in range(6)])
+
+    def test_renamed_project_is_found_by_its_new_name(self):
+        project, = self.make_projects(1)
+        project.project_name = 'Quasar rollout'
+        project.save()
+        self.assertEqual(self.names({'q': 'quasar'}), ['Quasar rollout'])
+        self.assertEqual(self.names({'q': 'project'}), [])
+
+    def test_malformed_cursor_is_rejected(self):
+        response = self.client.get(reverse('project_search'), {'q': 'project', 'cursor': encode_cursor([1])})
+        self.assertEqual(response.status_code, 400)
+
+
+class YearParameterTests(ProjectTestCase):
+
+    def test_out_of_range_year_is_rejected(self):
+        for year in ('99999999999999999999', '-5', '1899', '10000'):
+            for url in (reverse('project_query'), reverse('project_changes'), reverse('dashboard_data')):
+                response = self.client.get(url, {'year': year, 'since': timezone.now().isoformat()})
+                self.assertEqual(response.status_code, 400, (url, year))
+        self.assertEqual(self.client.get(reverse('scorecard', args=[99999999999999999999])).status_code, 400)
+
+    def test_year_in_range_is_accepted(self):
+        self.assertEqual(self.client.get(reverse('project_query'), {'year': '2025'}).status_code, 200)
+
+
+class PayloadTests(ProjectTestCase):
+
+    def create_category(self, year, form=False):
+        body = {'category_name': 'Reach', 'scorecard_year': year}
+        if form:
+            return self.client.post(reverse('category_create'), body)
+        return self.client.post(reverse('category_create'), json.dumps(body), content_type='application/json')
+
+    def test_scorecard_year_out_of_range_or_bool_is_rejected(self):
+        for year in (-5, True, 10000, '99999999999999999999'):
+            response = self.create_category(year)
+            self.assertEqual(response.status_code, 400, year)
+            self.assertEqual(response.content, b'Invalid scorecard_year')
+        self.assertFalse(Category.objects.filter(category_name='Reach').exists())
+
+    def test_scorecard_year_from_a_form_is_accepted(self):
+        self.assertEqual(self.create_category('2027', form=True).status_code, 200)
+        self.assertEqual(Category.objects.get(category_name='Reach').scorecard_year, 2027)
+
+
+class ColumnarPayloadTests(ProjectTestCase):
+
+    def test_codes_decode_to_each_projects_values(self):
+        other = Status.objects.create(status_name='Delayed')
+        first, second = self.make_projects(2)
+        second.project_status = other
+        second.project_phase = 'Live'
+        second.save()
+        data = self.client.get(reverse('dashboard_data'), {'year': 2025}).json()
+        columns, lookup = data['projects'], data['lookup']
+        decoded = {
+            uid: (lookup['project_status'][columns['project_status'][i]][1],
+                  lookup['owner'][columns['owner'][i]][0],
+                  lookup['project_phase'][columns['project_phase'][i]][0],
+                  data['categories']['uid'][columns['category'][i]])
+            for i, uid in enumerate(columns['uid'])
+        }
+        self.assertEqual(decoded, {
+            str(first.uid): ('On Track', str(self.user.uid), first.project_phase, str(self.category.uid)),
+            str(second.uid): ('Delayed', str(self.user.uid), 'Live', str(self.category.uid)),
+        })
+
+
+class DashboardCacheTests(ProjectTestCase):
+
+    def test_hits_and_misses_are_counted(self):
+        before = cache_stats()
+        self.assertEqual(get_or_build('test', (1,), lambda: {'built': True}), {'built': True})
+        self.assertEqual(get_or_build('test', (1,), lambda: {'built': False}), {'built': True})
+        after = cache_stats()
+        self.assertEqual((after['hits'] - before['hits'], after['misses'] - before['misses']), (1, 1))
+
+
+class ImportTests(ProjectTestCase):
+
+    def rows(self, *rows):
+        header = 'uid,project_name,category,project_status,owner,stretch_target_date\n'
+        lines = [f'{uid},{name},Growth,On Track,owner@example.com,2025-09-30\n' for uid, name in rows]
+        return read_csv(io.StringIO(header + ''.join(lines)))
+
+    def test_rows_are_created_and_upserted_by_uid(self):
+        project, = self.make_projects(1)
+        result = import_projects(self.rows(('', 'Fresh'), (project.uid, 'Renamed')))
+        self.assertEqual((result['created'], result['updated'], result['failed']), (1, 1, 0))
+        project.refresh_from_db()
+        self.assertEqual(project.project_name, 'Renamed')
+        self.assertEqual(project.owner, self.user)
+        self.assertTrue(Project.objects.filter(project_name='Fresh', category=self.category).exists())
+
+    def test_uid_repeated_in_a_batch_is_rejected(self):
+        project, = self.make_projects(1)
+        result = import_projects(self.rows((project.uid, 'First'), (project.uid, 'Second')))
+        self.assertEqual(result['errors'], [{'line': 3, 'error': 'Duplicate uid'}])
+        project.refresh_from_db()
+        self.assertEqual(project.project_name, 'First')
+
+    def test_uid_repeated_in_a_later_batch_updates_again(self):
+        project, = self.make_projects(1)
+        result = import_projects(self.rows((project.uid, 'First'), (project.uid, 'Second')), batch_size=1)
+        self.assertEqual((result['updated'], result['failed']), (2, 0))
+        project.refresh_from_db()
+        self.assertEqual(project.project_name, 'Second')
+
+
+class ScorecardTests(ProjectTestCase):
+
+    def scorecard(self):
+        return self.client.get(reverse('scorecard', args=[2025])).json()
+
+    def test_scores_follow_a_status_change(self):
+        first, _ = self.make_projects(2)
+        data = self.scorecard()
+        self.assertEqual((data['score'], data['max_score']), ('10.000', '10.000'))
+        first.project_status = Status.objects.create(status_name='At Risk')
+        first.save()
+        data = self.scorecard()
+        self.assertEqual((data['score'], data['max_score']), ('7.500', '10.000'))
+        self.assertEqual(data['categories'][0]['project_count'], 2)
+
+    def test_year_totals_add_up_categories(self):
+        other = Category.objects.create(category_name='Reach', objective_weight=Decimal('2.0'), scorecard_year=2025)
+        self.make_projects(1)
+        Project.objects.create(
+            project_name='Reach 00', category=other, project_status=self.status, owner=self.user,
+            measure_initiative_weight=Decimal('1.5'), stretch_target_date=date(2025, 6, 30),
+        )
+        data = self.scorecard()
+        self.assertEqual([c['score'] for c in data['categories']], ['5.000', '3.000'])
+        self.assertEqual(data['score'], '8.000')
+
+
+class ExportTests(ProjectTestCase):
+
+    def test_csv_covers_the_year_across_chunks(self):
+        projects = self.make_projects(5)
+        older = Category.objects.create(category_name='Legacy', objective_weight=Decimal('1.0'), scorecard_year=2024)
+        Project.objects.create(
+            project_name='Old', category=older, project_status=self.status, owner=self.user,
+            measure_initiative_weight=Decimal('1.0'), stretch_target_date=date(2024, 6, 30),
+        )
+        rows = list(csv.DictReader(io.StringIO(''.join(iter_csv(2025, chunk_size=2)))))
+        self.assertEqual(sorted(r['uid'] for r in rows), sorted(str(p.uid) for p in projects))
+        self.assertEqual({(r['category'], r['scorecard_year'], r['owner']) for r in rows}, {('Growth', '2025', 'owner@example.com')})
+
+    def test_exported_csv_imports_back_as_updates(self):
+        self.make_projects(3)
+        response = self.client.get(reverse('export_projects_csv'), {'scorecard_year': 2025})
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        result = import_projects(read_csv(io.StringIO(content)))
+        self.assertEqual((result['created'], result['updated'], result['failed']), (0, 3, 0))
+
+    @skipUnless(find_spec('pyarrow'), 'Parquet export requires pyarrow')
+    def test_parquet_has_every_row(self):
+        import pyarrow.parquet as pq
+        self.make_projects(3)
+        table = pq.read_table(io.BytesIO(b''.join(iter_parquet(2025, chunk_size=2))))
+        self.assertEqual(sorted(table.column('project_name').to_pylist()), [f'Project {i:02d}' for i in range(3)])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are checked on SQLite')
+class IndexTests(ProjectTestCase):
+
+    def test_dashboard_category_page_reads_the_year_index(self):
+        plan = Category.objects.filter(scorecard_year=2025).order_by('category_name', 'uid').explain()
+        self.assertIn('category_year_name_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_category_projects_read_the_name_index(self):
+        plan = Project.objects.filter(category=self.category).order_by('project_name', 'uid').explain()
+        self.assertIn('project_category_name_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_owner_due_dates_read_the_owner_index(self):
+        plan = Project.objects.filter(owner=self.user, stretch_target_date__gte=date(2025, 1, 1)).explain()
+        self.assertIn('project_owner_date_idx', plan)
+
+
+class ConditionalGetTests(ProjectTestCase):
+
+    def test_matching_etag_gets_304_until_the_project_changes(self):
+        project, = self.make_projects(1)
+        url = reverse('project_detail', args=[project.uid])
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        project.comment = 'changed'
+        project.save()
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_dashboard_data_revalidates(self):
+        self.make_projects(2)
+        url = reverse('dashboard_data')
+        etag = self.client.get(url, {'year': 2025})['ETag']
+        self.assertEqual(self.client.get(url, {'year': 2025}, headers={'If-None-Match': etag}).status_code, 304)
+        self.make_projects(1, prefix='Later')
+        self.assertEqual(self.client.get(url, {'year': 2025}, headers={'If-None-Match': etag}).status_code, 200)
+
+
+class EventTests(ProjectTestCase):
+
+    def published_during(self, action):
+        """Events delivered to a subscriber of the configured backend while action() runs."""
+        async def collect():
+            backend = events.get_backend()
+            queue = backend.subscribe()
+            try:
+                await sync_to_async(action)()
+                # publish() hands events to the loop with call_soon_threadsafe
+                await asyncio.sleep(0)
+                received = []
+                while not queue.empty():
+                    received.append(queue.get_nowait())
+                return received
+            finally:
+                backend.unsubscribe(queue)
+        return async_to_sync(collect)()
+
+    def test_bulk_save_is_one_coalesced_event(self):
+        def bulk_import():
+            rows = [{'project_name': f'Imported {i}', 'category': 'Growth', 'project_status': 'On Track',
+                     'owner': 'owner@example.com', 'stretch_target_date': '2025-09-30'} for i in range(3)]
+            with self.captureOnCommitCallbacks(execute=True):
+                import_projects(rows)
+        received = self.published_during(bulk_import)
+        self.assertEqual(received, [events.make_batch_event('projects', {self.category.uid}, 3)])
+        self.assertEqual(received[0]['category_ids'], [str(self.category.uid)])
+
+    def test_feed_page_coalesces_project_changes(self):
+        self.make_projects(3)
+        changes, _, _ = change_page(project_queryset(), (timezone.now() - timedelta(minutes=1)).isoformat(), 200)
+        received = [e for e in events._feed_events(changes) if e['kind'].startswith('project')]
+        self.assertEqual(received, [events.make_batch_event('projects', {self.category.uid}, 3)])
+
+
+class MetricsTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+
+    def test_server_timing_counts_the_requests_queries(self):
+        project, = self.make_projects(1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('project_batch'), {'uids': str(project.uid)})
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+$')
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+
+    def test_histograms_are_kept_per_view(self):
+        self.client.get(reverse('project_batch'), {'uids': str(self.category.uid)})
+        self.client.get(reverse('project_batch'), {'uids': str(self.category.uid)})
+        text = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('project_tracker_request_duration_seconds_count{view="project_batch"} 2', text)
+        self.assertIn('# TYPE project_tracker_request_sql_queries histogram', text)
+
+
+class FacetTests(ProjectTestCase):
+
+    def counts(self, facet):
+        return {(c['label'], c['count']) for c in facet}
+
+    def test_facets_ignore_only_their_own_filter(self):
+        delayed = Status.objects.create(status_name='Delayed')
+        self.make_projects(3)
+        for project in self.make_projects(2, prefix='Late'):
+            project.project_status = delayed
+            project.project_phase = 'Live'
+            project.save()
+        data = self.client.get(reverse('project_query'), {'status': str(delayed.uid)}).json()
+        self.assertEqual([p['project_name'] for p in data['projects']], ['Late 00', 'Late 01'])
+        # Picking a status still shows what the others would add
+        self.assertEqual(self.counts(data['facets']['project_status']), {('On Track', 3), ('Delayed', 2)})
+        # Other facets only count the filtered projects
+        self.assertEqual(self.counts(data['facets']['project_phase']), {('Live', 2)})
+        self.assertEqual(self.counts(data['facets']['scorecard_year']), {('2025', 2)})
+
+    def test_unknown_sort_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('project_query'), {'sort': 'budget'}).status_code, 400)
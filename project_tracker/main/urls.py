@@ -3,7 +3,19 @@ from . import views
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('dashboard/data', views.dashboard_data, name='dashboard_data'),
+    path('dashboard/cache-stats/', views.dashboard_cache_stats, name='dashboard_cache_stats'),
+    path('metrics', views.metrics, name='metrics'),
     path('project/<uuid:uid>/', views.project_detail, name='project_detail'),
+    path('projects/batch', views.project_batch, name='project_batch'),
+    path('projects/query', views.project_query, name='project_query'),
+    path('projects/search', views.project_search, name='project_search'),
+    path('projects/changes', views.project_changes, name='project_changes'),
+    path('projects/bulk/', views.project_bulk, name='project_bulk'),
+    path('projects/import/', views.project_import, name='project_import'),
+    path('scorecard/<int:year>/', views.scorecard, name='scorecard'),
+    path('export/projects.csv', views.export_projects_csv, name='export_projects_csv'),
+    path('export/projects.parquet', views.export_projects_parquet, name='export_projects_parquet'),
     path('project/<uuid:uid>/update/', views.project_update, name='project_update'),
     path('category/<uuid:uid>/', views.category_detail, name='category_detail'),
     path('category/<uuid:uid>/update/', views.category_update, name='category_update'),
@@ -1,33 +1,115 @@
+import csv
+import io
 import json
-from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, HttpResponseBadRequest
+import uuid
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render
+from django.http import Http404, HttpResponse, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
-from .models import Category, Project, Status
-from users.models import User
+from django.utils import timezone
+from .models import MAX_SCORECARD_YEAR, MIN_SCORECARD_YEAR, Category, Project
 from decimal import Decimal
-from django.utils.dateparse import parse_date
+
+from django.contrib.admin.views.decorators import staff_member_required
+from .bulk import apply_bulk
+from .changes import change_page
+from .columnar import dashboard_columns
+from .conditional import category_state, conditional, dashboard_state, project_state
+from .cache import category_scope, get_or_build, stats as cache_stats
+from .facets import facet_counts, filter_q, parse_filters, parse_sort
+from .exporter import iter_csv, iter_parquet, parquet_schema
+from .importer import import_projects, read_csv, read_xlsx
+from .metrics import render_prometheus
+from .reference import get_owner, get_status
+from .payloads import CategoryCreate, CategoryUpdate, ProjectCreate, ProjectUpdate, validated_body
+from .scoring import year_scorecard
+from .search import search, search_cursor
+from .pagination import decode_cursor, encode_cursor, keyset_page, page_size
+
+CATEGORY_ORDERING = ('category_name', 'uid')
+PROJECT_ORDERING = ('project_name', 'uid')
+
+def selected_year(request, param='year', default_current=True):
+    """
+    The scorecard year a request is scoped to: ?year= if given, otherwise the
+    current year (or None when default_current is False). Raises ValueError,
+    also for years outside MIN_SCORECARD_YEAR..MAX_SCORECARD_YEAR.
+    """
+    raw = request.GET.get(param)
+    if not raw:
+        return timezone.localdate().year if default_current else None
+    try:
+        year = int(raw)
+    except ValueError:
+        raise ValueError(f'Invalid {param}')
+    if not MIN_SCORECARD_YEAR <= year <= MAX_SCORECARD_YEAR:
+        raise ValueError(f'Invalid {param}')
+    return year
+
+def _index_context(year):
+    years = set(Category.objects.order_by().values_list('scorecard_year', flat=True).distinct())
+    return {
+        'year': year,
+        'years': sorted(years | {year, timezone.localdate().year}, reverse=True),
+    }
 
 # Create your views here.
 @login_required(login_url="users/login")
+@conditional(dashboard_state)
 def index(request):
-    # Group projects by category for the dashboard
-    categories = Category.objects.prefetch_related('project_set__project_status', 'project_set__owner').all().order_by('category_name')
-    statuses = Status.objects.all()
-    # Provide owners and phase choices for modal selects
-    owners = User.objects.all().order_by('email')
-    phase_field = Project._meta.get_field('project_phase')
-    phases = getattr(phase_field, 'choices', [])
-    return render(request, 'main/index.html', {
-        'categories': categories,
-        'statuses': statuses,
-        'owners': owners,
-        'phases': phases,
-    })
+    # The page is a shell: rows and <select> options are rendered in the
+    # browser from dashboard_data's columnar payload.
+    try:
+        year = selected_year(request)
+    except ValueError:
+        year = timezone.localdate().year
+    context = get_or_build('index', (year,), lambda: _index_context(year))
+    return render(request, 'main/index.html', context)
+
+@login_required(login_url='users:login')
+@require_http_methods(['GET'])
+@conditional(dashboard_state)
+def dashboard_data(request):
+    """
+    One page of a year's categories, ordered by (category_name, uid), with
+    their projects, column-wise (see main.columnar). Optional ?limit=
+    (categories per page) and ?cursor= (from next_cursor).
+    """
+    cursor = request.GET.get('cursor') or ''
+    try:
+        year = selected_year(request)
+        limit = page_size(request)
+        # Category changes bump the global version, so the id list is cached
+        # globally and each page under every category's project scope
+        category_ids = get_or_build('year_categories', (year,), lambda: [
+            str(uid) for uid in Category.objects.filter(scorecard_year=year).values_list('uid', flat=True)])
+        payload = get_or_build(
+            'dashboard_data', (year, cursor, limit),
+            lambda: dashboard_columns(year, CATEGORY_ORDERING, PROJECT_ORDERING, cursor, limit),
+            scopes=[category_scope(uid) for uid in category_ids])
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return JsonResponse(payload, json_dumps_params={'separators': (',', ':')})
+
+# Columns read by project_to_dict; everything else is deferred.
+PROJECT_DICT_FIELDS = (
+    'uid', 'project_name', 'project_phase', 'stretch_target_date', 'budget', 'comment',
+    'measure_initiative_weight', 'updated_at', 'category__uid', 'category__category_name',
+    'project_status__uid', 'project_status__status_name',
+    'owner__uid', 'owner__email', 'owner__first_name', 'owner__last_name',
+)
+MAX_BATCH_SIZE = 500
+
+def project_queryset():
+    """Projects with everything project_to_dict needs, loaded in a single query."""
+    return Project.objects.select_related('project_status', 'owner', 'category').only(*PROJECT_DICT_FIELDS)
 
 def project_to_dict(project):
     return {
         'uid': str(project.uid),
+        'category_id': str(project.category_id),
+        'category': project.category.category_name,
         'project_name': project.project_name,
         'project_phase': project.project_phase,
         'project_status': project.project_status.status_name if project.project_status else None,
@@ -35,72 +117,292 @@ def project_to_dict(project):
         'stretch_target_date': project.stretch_target_date.isoformat() if project.stretch_target_date else None,
         'owner': project.owner.email if project.owner else None,
         'owner_id': str(project.owner.uid) if project.owner else None,
+        'owner_name': f'{project.owner.first_name} {project.owner.last_name}'.strip() if project.owner else None,
         'budget': str(project.budget) if project.budget is not None else None,
         'comment': project.comment if getattr(project, 'comment', None) else None,
         'measure_initiative_weight': str(project.measure_initiative_weight) if getattr(project, 'measure_initiative_weight', None) is not None else None,
     }
 
+@staff_member_required
+@require_http_methods(['GET'])
+def dashboard_cache_stats(request):
+    return JsonResponse(cache_stats())
+
+@staff_member_required
+@require_http_methods(['GET'])
+def metrics(request):
+    """Per-view request, SQL and template histograms in Prometheus text format."""
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def _parse_uids(values):
+    try:
+        return [uuid.UUID(str(v).strip()) for v in values if str(v).strip()]
+    except ValueError:
+        raise ValueError('Invalid uid')
+
+def load_projects(uids, year=None):
+    """
+    Fetch many projects in one query, optionally only those in scorecard
+    `year`. Returns {uid: project dict} for the uids found.
+    """
+    projects = project_queryset().filter(uid__in=uids)
+    if year is not None:
+        projects = projects.filter(category__scorecard_year=year)
+    return {p.uid: project_to_dict(p) for p in projects}
+
 @require_http_methods(['GET'])
-def project_detail(request, uid):
-    project = get_object_or_404(Project, uid=uid)
+@conditional(project_state)
+async def project_detail(request, uid):
+    try:
+        year = selected_year(request, default_current=False)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    projects = project_queryset().filter(uid=uid)
+    if year is not None:
+        projects = projects.filter(category__scorecard_year=year)
+    project = await projects.afirst()
+    if project is None:
+        raise Http404('No Project matches the given query.')
     return JsonResponse({'project': project_to_dict(project)})
 
-@require_http_methods(['POST'])
-def project_update(request, uid):
-    project = get_object_or_404(Project, uid=uid)
-    # accept JSON or form-encoded
-    data = request.POST if request.POST else None
+@login_required(login_url='users:login')
+@require_http_methods(['GET'])
+def project_query(request):
+    """
+    One keyset page of projects matching the filters, with facet counts.
+
+    Filters (comma-separated or repeated for several values): ?status=<uid>,
+    ?phase=, ?owner=<uid>, ?year=, plus ?target_from= / ?target_to=
+    (YYYY-MM-DD, inclusive). ?sort= is one of main.facets.SORTS. See
+    main.facets for how facets are counted.
+    """
     try:
-        name = (data.get('project_name') if data else request.body and __import__('json').loads(request.body).get('project_name'))
-    except Exception:
-        return HttpResponseBadRequest('Invalid payload')
-
-    if name:
-        project.project_name = name
-    phase = (data.get('project_phase') if data else __import__('json').loads(request.body).get('project_phase'))
-    if phase:
-        project.project_phase = phase
-    date = (data.get('stretch_target_date') if data else __import__('json').loads(request.body).get('stretch_target_date'))
-    if date:
-        from django.utils.dateparse import parse_date
-        d = parse_date(date)
-        if d:
-            project.stretch_target_date = d
-    budget = (data.get('budget') if data else __import__('json').loads(request.body).get('budget'))
-    if budget:
-        try:
-            project.budget = float(budget)
-        except Exception:
-            pass
-    measure = (data.get('measure_initiative_weight') if data else __import__('json').loads(request.body).get('measure_initiative_weight'))
-    if measure:
+        filters = parse_filters(request.GET)
+        sort, ordering = parse_sort(request.GET)
+        limit = page_size(request)
+        projects = project_queryset().filter(filter_q(filters))
+        projects, next_cursor = keyset_page(projects, ordering, request.GET.get('cursor') or '', limit)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return JsonResponse({
+        'projects': [project_to_dict(p) for p in projects],
+        'next_cursor': next_cursor,
+        'sort': sort,
+        'facets': facet_counts(filters),
+    })
+
+@login_required(login_url='users:login')
+@require_http_methods(['GET'])
+def project_search(request):
+    """
+    Ranked full-text search over project name, comment, category name and
+    owner email (see main.search). ?q= is required; the last word matches as
+    a prefix. Optional ?year=, ?limit= and ?cursor= (from next_cursor).
+    """
+    query = (request.GET.get('q') or '').strip()
+    if not query:
+        return HttpResponseBadRequest('q is required')
+    try:
+        year = selected_year(request, default_current=False)
+        limit = page_size(request)
+        cursor = request.GET.get('cursor')
+        after = None
+        if cursor:
+            rank, rowid = decode_cursor(cursor)
+            after = float(rank), int(rowid)
+    except ValueError:
+        return HttpResponseBadRequest('Invalid year, limit or cursor')
+    rows = search(query, year, after, limit + 1)
+    next_cursor = encode_cursor(search_cursor(rows[limit - 1])) if len(rows) > limit else None
+    rows = rows[:limit]
+    projects = load_projects([uuid.UUID(uid) for uid, _ in rows])
+    results = []
+    for uid, rank in rows:
+        project = projects.get(uuid.UUID(uid))
+        if project is not None:
+            results.append({**project, 'rank': rank})
+    return JsonResponse({'projects': results, 'next_cursor': next_cursor})
+
+@login_required(login_url='users:login')
+@require_http_methods(['GET', 'POST'])
+def project_batch(request):
+    """
+    Read many projects at once.
+
+    GET takes ?uids=<uid>,<uid>,... (or repeated ?uids=); POST takes a JSON
+    body {"uids": [...]} for lists too long for a query string. Projects are
+    returned in request order; unknown uids (or, with ?year=, uids outside
+    that scorecard year) are listed under "missing".
+    """
+    if request.method == 'POST':
         try:
-            project.measure_initiative_weight = Decimal(str(measure))
+            raw = json.loads(request.body.decode('utf-8')).get('uids') or []
         except Exception:
-            pass
-    owner_id = (data.get('owner_id') if data else __import__('json').loads(request.body).get('owner_id'))
-    if owner_id:
-        try:
-            owner = User.objects.get(uid=owner_id)
-            project.owner = owner
-        except User.DoesNotExist:
-            pass
+            return HttpResponseBadRequest('Invalid JSON payload')
+        if not isinstance(raw, list):
+            return HttpResponseBadRequest('uids must be a list')
+    else:
+        raw = [v for value in request.GET.getlist('uids') for v in value.split(',')]
+
+    try:
+        uids = list(dict.fromkeys(_parse_uids(raw)))
+        year = selected_year(request, default_current=False)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    if len(uids) > MAX_BATCH_SIZE:
+        return HttpResponseBadRequest(f'At most {MAX_BATCH_SIZE} uids per request')
+
+    found = load_projects(uids, year) if uids else {}
+    return JsonResponse({
+        'projects': [found[uid] for uid in uids if uid in found],
+        'missing': [str(uid) for uid in uids if uid not in found],
+    })
+
+@require_http_methods(['POST'])
+@validated_body(ProjectUpdate)
+async def project_update(request, uid, payload):
+    # project_queryset() loads what the response needs; save() then writes only those columns
+    project = await aget_object_or_404(project_queryset(), uid=uid)
+    if payload.owner_id:
+        owner = await sync_to_async(get_owner)(payload.owner_id)
+        if owner is None:
+            return HttpResponseBadRequest('Owner not found')
+        project.owner = owner
+    if payload.project_status_id:
+        status = await sync_to_async(get_status)(payload.project_status_id)
+        if status is None:
+            return HttpResponseBadRequest('Status not found')
+        project.project_status = status
+    for field in ('project_name', 'project_phase', 'stretch_target_date', 'budget', 'measure_initiative_weight'):
+        value = getattr(payload, field)
+        if value is not None:
+            setattr(project, field, value)
     # project-level comment
-    comment = (data.get('comment') if data else __import__('json').loads(request.body).get('comment'))
-    if comment is not None:
-        project.comment = comment
-    
-    status_id = (data.get('project_status_id') if data else __import__('json').loads(request.body).get('project_status_id'))
-    if status_id:
-        try:
-            status = Status.objects.get(uid=status_id)
-            project.project_status = status
-        except Status.DoesNotExist:
-            pass
+    if payload.comment is not None:
+        project.comment = payload.comment
 
-    project.save()
+    await project.asave()
     return JsonResponse({'ok': True, 'project': project_to_dict(project)})
 
+@login_required(login_url='users:login')
+@require_http_methods(['POST'])
+def project_bulk(request):
+    """
+    Create and partially update many projects in one transaction.
+
+    Body: {"create": [{...}], "update": [{"uid": ..., ...}]}. Create rows take
+    the same fields as project_create plus category_id; update rows take any
+    subset of the project_update fields. Returns one result per row.
+    """
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+    except Exception:
+        return HttpResponseBadRequest('Invalid JSON payload')
+    if not isinstance(data, dict):
+        return HttpResponseBadRequest('Invalid JSON payload')
+    creates = data.get('create') or []
+    updates = data.get('update') or []
+    if not isinstance(creates, list) or not isinstance(updates, list):
+        return HttpResponseBadRequest('create and update must be lists')
+    if len(creates) + len(updates) > MAX_BATCH_SIZE:
+        return HttpResponseBadRequest(f'At most {MAX_BATCH_SIZE} rows per request')
+
+    results = apply_bulk(creates, updates)
+    return JsonResponse({'ok': all(r['ok'] for r in results), 'results': results})
+
+@staff_member_required
+@require_http_methods(['POST'])
+def project_import(request):
+    """
+    Import projects from an uploaded CSV or XLSX file (multipart field "file").
+
+    ?dry_run=1 validates without inserting. See main.importer for the columns.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return HttpResponseBadRequest('file is required')
+    fmt = request.GET.get('format') or ('xlsx' if upload.name.lower().endswith('.xlsx') else 'csv')
+    dry_run = request.GET.get('dry_run') in ('1', 'true')
+    try:
+        if fmt == 'xlsx':
+            rows = read_xlsx(upload.file)
+        elif fmt == 'csv':
+            rows = read_csv(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+        else:
+            return HttpResponseBadRequest('format must be csv or xlsx')
+        result = import_projects(rows, dry_run=dry_run)
+    except ImportError as e:
+        return HttpResponseBadRequest(str(e))
+    except (UnicodeDecodeError, csv.Error):
+        return HttpResponseBadRequest('Could not read the uploaded file')
+    return JsonResponse({'ok': result['failed'] == 0, **result})
+
+def _export_filename(year, extension):
+    return f'projects-{year}.{extension}' if year is not None else f'projects.{extension}'
+
+@login_required(login_url='users:login')
+@require_http_methods(['GET'])
+def export_projects_csv(request):
+    try:
+        year = selected_year(request, 'scorecard_year', default_current=False)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    response = StreamingHttpResponse(iter_csv(year), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{_export_filename(year, "csv")}"'
+    return response
+
+@login_required(login_url='users:login')
+@require_http_methods(['GET'])
+def export_projects_parquet(request):
+    try:
+        year = selected_year(request, 'scorecard_year', default_current=False)
+        parquet_schema()
+    except (ValueError, ImportError) as e:
+        return HttpResponseBadRequest(str(e))
+    response = StreamingHttpResponse(iter_parquet(year), content_type='application/vnd.apache.parquet')
+    response['Content-Disposition'] = f'attachment; filename="{_export_filename(year, "parquet")}"'
+    return response
+
+@login_required(login_url='users:login')
+@require_http_methods(['GET'])
+def scorecard(request, year):
+    if not MIN_SCORECARD_YEAR <= year <= MAX_SCORECARD_YEAR:
+        return HttpResponseBadRequest('Invalid year')
+    return JsonResponse(year_scorecard(year))
+
+@login_required(login_url='users:login')
+@require_http_methods(['GET'])
+def project_changes(request):
+    """
+    Projects and categories changed since ?since= (a cursor from a previous
+    response, or an ISO datetime), plus tombstones for deleted rows, in
+    (updated_at, uid) order. Poll again with the returned cursor; has_more
+    means another page is already waiting. Changes from the last
+    CHANGE_FEED_OVERLAP seconds are returned again on the next poll (see
+    main.changes). Optional ?year= and ?limit=.
+    """
+    try:
+        year = selected_year(request, default_current=False)
+        limit = page_size(request)
+        changes, cursor, has_more = change_page(project_queryset(), request.GET.get('since'), limit, year)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    projects, categories, deleted = [], [], []
+    for kind, row in changes:
+        if kind == 'project':
+            projects.append({**project_to_dict(row), 'updated_at': row.updated_at.isoformat()})
+        elif kind == 'category':
+            categories.append({**category_to_dict(row), 'updated_at': row.updated_at.isoformat()})
+        else:
+            deleted.append({'kind': row.kind, 'uid': str(row.object_uid), 'category_id': str(row.category_uid) if row.category_uid else None})
+    return JsonResponse({
+        'projects': projects,
+        'categories': categories,
+        'deleted': deleted,
+        'cursor': cursor,
+        'has_more': has_more,
+    })
+
 def category_to_dict(category):
     return {
         'uid': str(category.uid),
@@ -110,132 +412,70 @@ def category_to_dict(category):
     }
 
 @require_http_methods(['GET'])
-def category_detail(request, uid):
-    category = get_object_or_404(Category, uid=uid)
+@conditional(category_state)
+async def category_detail(request, uid):
+    try:
+        year = selected_year(request, default_current=False)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    categories = Category.objects.all() if year is None else Category.objects.filter(scorecard_year=year)
+    category = await aget_object_or_404(categories, uid=uid)
     return JsonResponse({'category': category_to_dict(category)})
 
 @require_http_methods(['POST'])
-def category_update(request, uid):
-    category = get_object_or_404(Category, uid=uid)
-    data = request.POST if request.POST else None
-    try:
-        name = (data.get('category_name') if data else request.body and __import__('json').loads(request.body).get('category_name'))
-    except Exception:
-        return HttpResponseBadRequest('Invalid payload')
-
-    if name:
-        category.category_name = name
-    weight = (data.get('objective_weight') if data else __import__('json').loads(request.body).get('objective_weight'))
-    if weight:
-        try:
-            category.objective_weight = Decimal(str(weight))
-        except Exception:
-            pass
-    year = (data.get('scorecard_year') if data else __import__('json').loads(request.body).get('scorecard_year'))
-    if year:
-        try:
-            category.scorecard_year = int(year)
-        except Exception:
-            pass
+@validated_body(CategoryUpdate)
+async def category_update(request, uid, payload):
+    category = await aget_object_or_404(Category, uid=uid)
+    for field in ('category_name', 'objective_weight', 'scorecard_year'):
+        value = getattr(payload, field)
+        if value is not None:
+            setattr(category, field, value)
 
-    category.save()
+    await category.asave()
     return JsonResponse({'ok': True, 'category': category_to_dict(category)})
 
 @require_http_methods(['POST'])
-def category_create(request):
-    data = request.POST if request.POST else None
+@validated_body(CategoryCreate)
+def category_create(request, payload):
     try:
-        name = (data.get('category_name') if data else request.body and __import__('json').loads(request.body).get('category_name'))
-    except Exception:
-        return HttpResponseBadRequest('Invalid payload')
-    
-    if not name:
-        return HttpResponseBadRequest('Category name is required')
-    
-    weight = (data.get('objective_weight') if data else __import__('json').loads(request.body).get('objective_weight'))
-    year = (data.get('scorecard_year') if data else __import__('json').loads(request.body).get('scorecard_year'))
-    
-    try:
-        w = Decimal(str(weight)) if weight else Decimal('1.0')
-        y = int(year) if year else 2026
         category = Category.objects.create(
-            category_name=name,
-            objective_weight=w,
-            scorecard_year=y,
+            category_name=payload.category_name,
+            objective_weight=payload.objective_weight if payload.objective_weight is not None else Decimal('1.0'),
+            scorecard_year=payload.scorecard_year or 2026,
         )
         return JsonResponse({'ok': True, 'category': category_to_dict(category)})
     except Exception as e:
         return HttpResponseBadRequest(f'Error creating category: {str(e)}')
 
 @require_http_methods(['POST'])
-def project_create(request, cat_uid):
-    
-    try:
-        my_data = json.loads(request.body.decode('utf-8'))
-    except Exception:
-        return HttpResponseBadRequest('Invalid JSON payload')
-
-    name = (my_data.get('project_name') or '').strip()
-    if not name:
-        return HttpResponseBadRequest('Project name is required')
-
-    phase = my_data.get('project_phase') or 'Requirement'
-    date_str = my_data.get('stretch_target_date')
-
-    target_date = parse_date(date_str) if date_str else None
-    if not target_date:
-        return HttpResponseBadRequest('Valid stretch_target_date is required (YYYY-MM-DD)')
-
-    
+@validated_body(ProjectCreate)
+def project_create(request, cat_uid, payload):
     try:
         category = Category.objects.get(uid=cat_uid)
     except Category.DoesNotExist:
         return HttpResponseBadRequest('Category not found')
 
-    status_id = my_data.get('project_status_id')
-    owner_id = my_data.get('owner_id')
-
-    if not status_id:
-        return HttpResponseBadRequest('project_status_id is required')
-    if not owner_id:
-        return HttpResponseBadRequest('owner_id is required')
-
-    try:
-        status = Status.objects.get(pk=status_id)
-    except Status.DoesNotExist:
+    status = get_status(payload.project_status_id)
+    if status is None:
         return HttpResponseBadRequest('Status not found')
 
-    try:
-        owner = User.objects.get(pk=owner_id)
-    except User.DoesNotExist:
+    owner = get_owner(payload.owner_id)
+    if owner is None:
         return HttpResponseBadRequest('Owner not found')
 
-    budget_raw = my_data.get('budget')
-    weight_raw = my_data.get('measure_initiative_weight')
-
-    try:
-        budget = Decimal(str(budget_raw)) if budget_raw not in (None, '',) else Decimal('0.0')
-    except Exception:
-        return HttpResponseBadRequest('Invalid budget')
-
-    try:
-        weight = Decimal(str(weight_raw)) if weight_raw not in (None, '',) else Decimal('0.0')
-    except Exception:
-        return HttpResponseBadRequest('Invalid measure_initiative_weight')
-
-   
     try:
         project = Project.objects.create(
-            project_name=name,
-            category=category,                 
-            project_phase=phase,
-            project_status=status,             
-            owner=owner,                       
-            stretch_target_date=target_date,   
-            budget=budget,
-            measure_initiative_weight=weight,
+            project_name=payload.project_name,
+            category=category,
+            project_phase=payload.project_phase,
+            project_status=status,
+            owner=owner,
+            stretch_target_date=payload.stretch_target_date,
+            budget=payload.budget if payload.budget is not None else Decimal('0.0'),
+            measure_initiative_weight=payload.measure_initiative_weight if payload.measure_initiative_weight is not None else Decimal('0.0'),
+            comment=payload.comment,
         )
     except Exception as e:
         return HttpResponseBadRequest(f'Error creating project: {str(e)}')
 
-    return JsonResponse({'ok': True, 'project': project_to_dict(project)})
\ No newline at end of file
+    return JsonResponse({'ok': True, 'project': project_to_dict(project)})
@@ -2,6 +2,9 @@
 ASGI config for project_tracker project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn project_tracker.asgi:application``)
+to enable the /projects/events change stream; under WSGI the dashboard falls
+back to polling /projects/changes.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
@@ -13,4 +16,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_tracker.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up
+from main.asgi import with_event_stream  # noqa: E402
+
+application = with_event_stream(django_application)
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,7 +66,8 @@ ROOT_URLCONF = 'project_tracker.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to main.metrics
+        'BACKEND': 'main.metrics.TimedDjangoTemplates',
         'DIRS': [BASE_DIR, 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -98,6 +100,105 @@ else:
         }
     }
 
+# SQLite tuning applied to every new connection by main.sqlite.apply_pragmas.
+# Set any value to an empty string to leave SQLite's default in place.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    # Negative cache_size is in KiB: -20000 is about 20 MB of page cache per connection
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -20000)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+# BEGIN IMMEDIATE takes the write lock up front, so a transaction that reads
+# then writes waits on busy_timeout instead of failing mid-way on upgrade.
+for _database in DATABASES.values():
+    _database.setdefault('OPTIONS', {}).setdefault('transaction_mode', os.getenv('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'))
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# The dashboard cache backend is chosen with DASHBOARD_CACHE_BACKEND
+# ('locmem' or 'file'); entries expire after DASHBOARD_CACHE_TTL seconds and
+# the backend culls once DASHBOARD_CACHE_MAX_ENTRIES is reached. The default
+# file backend is shared by every worker process on the host, so a change
+# saved in one worker invalidates the payloads cached by the others; use
+# DASHBOARD_CACHE_BACKEND=locmem only for single-process runs.
+DASHBOARD_CACHE_ALIAS = 'dashboard'
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 300))
+
+_dashboard_cache_backends = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+_dashboard_cache_backend = os.getenv('DASHBOARD_CACHE_BACKEND', 'file')
+
+# OTP codes (users.otp). The default file backend is shared by every worker
+# process on the host and makes the attempt counter's incr() atomic across
+# them; use OTP_CACHE_BACKEND=locmem only for single-process runs. Expired
+# entries are culled first once OTP_CACHE_MAX_ENTRIES is reached (about two
+# per user with an outstanding code), so keep it well above concurrent logins.
+OTP_CACHE_ALIAS = 'otp'
+_otp_cache_backend = os.getenv('OTP_CACHE_BACKEND', 'file')
+# LockingFileBasedCache adds cross-process atomic add()/incr() to the file backend
+_shared_cache_backends = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'users.cache_backends.LockingFileBasedCache',
+}
+
+# Sessions and cached users (see AUTHENTICATION_BACKENDS below); 'file' or 'locmem'
+AUTH_CACHE_ALIAS = 'auth'
+AUTH_CACHE_BACKEND = os.getenv('AUTH_CACHE_BACKEND', 'file')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    AUTH_CACHE_ALIAS: {
+        'BACKEND': _shared_cache_backends[AUTH_CACHE_BACKEND],
+        'LOCATION': os.getenv('AUTH_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'auth') if AUTH_CACHE_BACKEND == 'file' else 'auth'),
+        'OPTIONS': {
+            # Evicted sessions are reloaded from the database, so culling only costs a query
+            'MAX_ENTRIES': int(os.getenv('AUTH_CACHE_MAX_ENTRIES', 20000)),
+            'CULL_FREQUENCY': 4,
+        },
+    },
+    OTP_CACHE_ALIAS: {
+        'BACKEND': _shared_cache_backends[_otp_cache_backend],
+        'LOCATION': os.getenv('OTP_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'otp') if _otp_cache_backend == 'file' else 'otp'),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('OTP_CACHE_MAX_ENTRIES', 20000)),
+            'CULL_FREQUENCY': 4,
+        },
+    },
+    DASHBOARD_CACHE_ALIAS: {
+        'BACKEND': _dashboard_cache_backends[_dashboard_cache_backend],
+        'LOCATION': os.getenv('DASHBOARD_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'dashboard') if _dashboard_cache_backend == 'file' else 'dashboard'),
+        'TIMEOUT': DASHBOARD_CACHE_TTL,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('DASHBOARD_CACHE_MAX_ENTRIES', 1000)),
+            'CULL_FREQUENCY': 3,
+        },
+    },
+}
+
+# Change events pushed over SSE (main.events). InProcessBackend only reaches
+# clients of the same process; use ChangeFeedBackend when running several
+# ASGI workers. Both require serving the app through project_tracker.asgi.
+EVENTS_BACKEND = os.getenv('EVENTS_BACKEND', 'main.events.InProcessBackend')
+EVENTS_POLL_INTERVAL = float(os.getenv('EVENTS_POLL_INTERVAL', 2))
+EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', 20))
+
+# Seconds of history the change feed re-reads on each poll (main.changes), to
+# pick up rows whose transaction committed after a poll had read past their
+# updated_at. Keep it above the longest write transaction, busy_timeout included.
+CHANGE_FEED_OVERLAP = float(os.getenv('CHANGE_FEED_OVERLAP', 10))
+
+# main.metrics.MetricsMiddleware: per-view histograms are served to staff at
+# /metrics; the Server-Timing header (total, SQL and template time) can be
+# turned off if clients should not see it.
+METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'True') == 'True'
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -137,6 +238,27 @@ STATIC_URL = 'static/'
 # Use custom user model
 AUTH_USER_MODEL = 'users.User'
 
+# Sessions and request.user are served from AUTH_CACHE_ALIAS. A logout,
+# password change or deactivation in one worker must reach the others, so
+# that only happens when the cache is shared between processes (the default
+# file backend); with AUTH_CACHE_BACKEND=locmem sessions come straight from
+# the database and users are not cached.
+_auth_cache_shared = AUTH_CACHE_BACKEND != 'locmem'
+
+# The cached backend serves request.user from AUTH_USER_CACHE_ALIAS for a few
+# seconds; ModelBackend stays listed so sessions created before it still load.
+AUTHENTICATION_BACKENDS = [
+    *(['users.backends.CachedModelBackend'] if _auth_cache_shared else []),
+    'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_ALIAS = AUTH_CACHE_ALIAS
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 60))
+
+# Sessions are read from the cache and written through to the database, so a
+# cache miss still finds the session.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE', 'django.contrib.sessions.backends.' + ('cached_db' if _auth_cache_shared else 'db'))
+SESSION_CACHE_ALIAS = AUTH_CACHE_ALIAS
+
 # Email Configuration for OTP
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = os.getenv('EMAIL_HOST')
@@ -157,5 +279,33 @@ if not EMAIL_HOST_USER or not EMAIL_HOST_PASSWORD:
 else:
     print(f"Email configuration: HOST={EMAIL_HOST}, PORT={EMAIL_PORT}, USE_TLS={EMAIL_USE_TLS}, USE_SSL={EMAIL_USE_SSL}")
 
+# Scorecard attainment factor per project status, used by main.scoring.
+# Statuses not listed count as 0.
+SCORECARD_ATTAINMENT = {
+    'Completed': 1.0,
+    'On Track': 1.0,
+    'At Risk': 0.5,
+    'Delayed': 0.25,
+    'Planned': 0.0,
+}
+
 # OTP Settings
 OTP_VALIDITY_MINUTES = 10
+OTP_MAX_ATTEMPTS = int(os.getenv('OTP_MAX_ATTEMPTS', 5))
+
+# Email outbox (users.outbox). Emails are written to the OutboundEmail table
+# and delivered by `manage.py run_email_worker`, or by a background thread in
+# the web process when EMAIL_OUTBOX_IN_PROCESS is true. Use
+# users.outbox.FakeTransport to record messages locally instead of sending.
+EMAIL_OUTBOX_TRANSPORT = os.getenv('EMAIL_OUTBOX_TRANSPORT', 'users.outbox.BrevoTransport')
+# Used by `run_email_worker --async` (needs httpx)
+EMAIL_OUTBOX_ASYNC_TRANSPORT = os.getenv('EMAIL_OUTBOX_ASYNC_TRANSPORT', 'users.outbox.AsyncBrevoTransport')
+EMAIL_OUTBOX_IN_PROCESS = os.getenv('EMAIL_OUTBOX_IN_PROCESS', 'False') == 'True'
+EMAIL_WORKER_CONCURRENCY = int(os.getenv('EMAIL_WORKER_CONCURRENCY', 4))
+# (connect, read) timeouts in seconds for provider calls
+EMAIL_HTTP_TIMEOUT = (float(os.getenv('EMAIL_CONNECT_TIMEOUT', 3.05)), float(os.getenv('EMAIL_READ_TIMEOUT', 10)))
+EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 5))
+# A message claimed longer ago than this is assumed orphaned by a dead worker.
+# Workers shrink their batches to fit (users.outbox.claim_size), so it must
+# exceed one send's worst case: 3 tries x (connect + read timeout) + 8s of waits.
+EMAIL_CLAIM_TIMEOUT = int(os.getenv('EMAIL_CLAIM_TIMEOUT', 120))
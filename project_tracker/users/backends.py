@@ -0,0 +1,48 @@
+"""
+Authentication backend that caches the user loaded for each request.
+
+AuthenticationMiddleware calls get_user() on every authenticated request
+(aget_user() from async code such as main.asgi and the async views);
+CachedModelBackend serves both from the cache for AUTH_USER_CACHE_TTL seconds.
+Entries are dropped when the user is saved or deleted and on logout
+(users.signals), and Django still checks the session auth hash against the
+cached user, so a password change ends other sessions as before.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def get_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def _key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def invalidate_user(user_id):
+    get_cache().delete(_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        cache = get_cache()
+        key = _key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+        return user
+
+    async def aget_user(self, user_id):
+        cache = get_cache()
+        key = _key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, settings.AUTH_USER_CACHE_TTL)
+        return user
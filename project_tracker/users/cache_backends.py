@@ -0,0 +1,88 @@
+"""
+Cache backends for data that several worker processes must agree on.
+
+LockingFileBasedCache is Django's FileBasedCache with add() and incr() made
+atomic across processes by an flock() on a lock file in the cache
+directory, so it can hold counters such as users.otp's attempt counts.
+incr() also keeps the entry's expiry instead of resetting it to the
+default timeout. When the cache is full, expired entries are removed before
+any live ones are culled at random.
+"""
+import fcntl
+import os
+import pickle
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from asgiref.sync import sync_to_async
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files.move import file_move_safe
+
+LOCK_FILE = 'lock'
+
+
+class LockingFileBasedCache(FileBasedCache):
+
+    @contextmanager
+    def _locked(self):
+        self._createdir()
+        # Not named *.djcache, so clear() and culling leave it alone
+        with open(os.path.join(self._dir, LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._locked():
+            fname = self._key_to_file(key, version)
+            try:
+                with open(fname, 'rb') as f:
+                    expiry = pickle.load(f)
+                    value = pickle.loads(zlib.decompress(f.read()))
+            except (FileNotFoundError, EOFError):
+                expiry = value = None
+            if value is None or (expiry is not None and expiry < time.time()):
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            self._write_with_expiry(fname, expiry, value)
+            return value
+
+    async def aincr(self, key, delta=1, version=None):
+        # BaseCache.aincr() is a get-then-set of its own; route it through the locked incr()
+        return await sync_to_async(self.incr, thread_sensitive=True)(key, delta, version)
+
+    def _write_with_expiry(self, fname, expiry, value):
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        renamed = False
+        try:
+            with open(fd, 'wb') as f:
+                f.write(pickle.dumps(expiry, self.pickle_protocol))
+                f.write(zlib.compress(pickle.dumps(value, self.pickle_protocol)))
+            file_move_safe(tmp_path, fname, allow_overwrite=True)
+            renamed = True
+        finally:
+            if not renamed:
+                os.remove(tmp_path)
+
+    def _cull(self):
+        filelist = self._list_cache_files()
+        if len(filelist) < self._max_entries:
+            return
+        now = time.time()
+        for fname in filelist:
+            try:
+                with open(fname, 'rb') as f:
+                    expiry = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                continue
+            if expiry is not None and expiry < now:
+                self._delete(fname)
+        super()._cull()
@@ -0,0 +1,56 @@
+import asyncio
+import time
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from users.outbox import adrain_outbox, drain_outbox, get_async_transport, get_transport
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails from the outbox, polling until interrupted.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when the outbox is empty.')
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, help='Parallel sends (default EMAIL_WORKER_CONCURRENCY).')
+        parser.add_argument('--async', dest='use_async', action='store_true',
+                            help='Send through EMAIL_OUTBOX_ASYNC_TRANSPORT on an event loop instead of threads.')
+
+    def handle(self, *args, **options):
+        if options['use_async']:
+            try:
+                asyncio.run(self.run_async(options))
+            except KeyboardInterrupt:
+                pass
+            return
+        transport = get_transport()
+        try:
+            while True:
+                sent, failed = drain_outbox(transport, options['batch_size'], options['concurrency'])
+                self.report(sent, failed)
+                if options['once']:
+                    break
+                close_old_connections()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            transport.close()
+
+    async def run_async(self, options):
+        transport = get_async_transport()
+        try:
+            while True:
+                sent, failed = await adrain_outbox(transport, options['batch_size'], options['concurrency'])
+                self.report(sent, failed)
+                if options['once']:
+                    break
+                await sync_to_async(close_old_connections)()
+                await asyncio.sleep(options['interval'])
+        finally:
+            await transport.aclose()
+
+    def report(self, sent, failed):
+        if sent or failed:
+            self.stdout.write(f'Sent {sent}, failed or rescheduled {failed}.')
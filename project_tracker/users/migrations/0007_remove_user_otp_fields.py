@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 11:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_outboundemail'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='otp_code',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='otp_expiry',
+        ),
+    ]
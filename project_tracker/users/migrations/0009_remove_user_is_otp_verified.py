@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 11:19
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_outboundemail_dedupe_key'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='is_otp_verified',
+        ),
+    ]
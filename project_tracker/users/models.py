@@ -3,7 +3,6 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils import timezone
-from datetime import timedelta
 
 class CustomUserManager(BaseUserManager):
     use_in_migrations = True
@@ -54,10 +53,7 @@ class User(AbstractUser):
         blank=True,
         help_text=('Specific permissions for this user.'),
     )
-    # OTP fields
-    otp_code = models.CharField(max_length=6, blank=True, null=True)
-    otp_expiry = models.DateTimeField(blank=True, null=True)
-    is_otp_verified = models.BooleanField(default=False)
+    # OTP codes live in users.otp (cache-backed), not on this row
     otp_method = models.CharField(
         max_length=10,
         choices=[('email', 'Email'), ('sms', 'SMS')],
@@ -81,14 +77,67 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
-    def is_otp_valid(self):
-        """Check if OTP is still valid."""
-        if not self.otp_expiry:
-            return False
-        return timezone.now() < self.otp_expiry
-
     def set_otp(self, otp_code, validity_minutes=10):
-        """Set OTP code and expiry time."""
-        self.otp_code = otp_code
-        self.otp_expiry = timezone.now() + timedelta(minutes=validity_minutes)
-        self.save()
+        """Store a hashed OTP code in the OTP cache; the user row is not written."""
+        from . import otp
+        otp.issue(self, otp_code, validity_minutes)
+
+    def verify_otp(self, otp_code):
+        """Check an OTP code; returns one of the users.otp result constants."""
+        from . import otp
+        return otp.verify(self, otp_code)
+
+    async def aset_otp(self, otp_code, validity_minutes=10):
+        from . import otp
+        await otp.aissue(self, otp_code, validity_minutes)
+
+    async def averify_otp(self, otp_code):
+        from . import otp
+        return await otp.averify(self, otp_code)
+
+
+class OutboundEmail(models.Model):
+    """
+    Email waiting to be delivered by the outbox worker (users.outbox).
+    Views write a row and return immediately instead of calling the provider.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    uid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    to_email = models.EmailField()
+    to_name = models.CharField(max_length=150, blank=True)
+    subject = models.CharField(max_length=200)
+    html_content = models.TextField()
+    status = models.CharField(
+        max_length=10,
+        choices=[(STATUS_PENDING, 'Pending'), (STATUS_SENDING, 'Sending'), (STATUS_SENT, 'Sent'), (STATUS_FAILED, 'Failed')],
+        default=STATUS_PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # Messages not delivered by this time are dropped (e.g. an expired OTP)
+    expires_at = models.DateTimeField(blank=True, null=True)
+    # Idempotency key for messages that must go out once (e.g. one digest per
+    # owner per day); enqueue_emails() skips keys that are already queued
+    dedupe_key = models.CharField(max_length=100, unique=True, blank=True, null=True)
+    # Bulk mail queued by enqueue_emails(): the worker sends these several
+    # per provider call (transport.send_batch) instead of one by one
+    batched = models.BooleanField(default=False)
+    claim_token = models.UUIDField(blank=True, null=True)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.to_email} ({self.status})'
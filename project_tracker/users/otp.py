@@ -0,0 +1,116 @@
+"""
+OTP store backed by the Django cache (settings.OTP_CACHE_ALIAS).
+
+Codes are kept hashed, keyed by user, and expire with the cache entry's TTL,
+so nothing is written to the User row and no cleanup pass is needed.
+
+Wrong guesses are counted in a separate key with cache.incr(), and the
+limit is checked on the value incr() returns. Each guess gets its own
+number even when several arrive at once, so at most OTP_MAX_ATTEMPTS
+guesses are ever compared against a code. That needs a backend with an
+atomic incr() shared by every worker (users.cache_backends or redis/memcached).
+Each function has an a-prefixed coroutine twin for async views.
+"""
+import hashlib
+import hmac
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+VERIFIED = 'verified'
+INVALID = 'invalid'
+EXPIRED = 'expired'
+LOCKED = 'locked'
+
+
+def get_cache():
+    return caches[settings.OTP_CACHE_ALIAS]
+
+
+def _key(user_id):
+    return f'otp:{user_id}'
+
+
+def _attempts_key(user_id):
+    return f'otp:{user_id}:attempts'
+
+
+def _digest(user_id, code):
+    return hmac.new(settings.SECRET_KEY.encode(), f'{user_id}:{code}'.encode(), hashlib.sha256).hexdigest()
+
+
+def _new_entry(user, code, validity_minutes):
+    ttl = int((validity_minutes or settings.OTP_VALIDITY_MINUTES) * 60)
+    return {'hash': _digest(user.pk, code), 'expires': time.time() + ttl}, ttl
+
+
+def _check(user, code, entry, attempt):
+    """
+    Decide the outcome of guess number `attempt` against the stored `entry`.
+    Returns (result, discard) where discard means the code is used up.
+    """
+    if attempt > settings.OTP_MAX_ATTEMPTS:
+        return LOCKED, True
+    if hmac.compare_digest(entry['hash'], _digest(user.pk, code)):
+        return VERIFIED, True
+    if attempt >= settings.OTP_MAX_ATTEMPTS:
+        return LOCKED, True
+    return INVALID, False
+
+
+def _remaining(entry):
+    return entry['expires'] - time.time()
+
+
+def issue(user, code, validity_minutes=None):
+    """Store a hashed code for `user`, replacing any outstanding one and its attempt count."""
+    entry, ttl = _new_entry(user, code, validity_minutes)
+    get_cache().set_many({_key(user.pk): entry, _attempts_key(user.pk): 0}, ttl)
+
+
+async def aissue(user, code, validity_minutes=None):
+    entry, ttl = _new_entry(user, code, validity_minutes)
+    await get_cache().aset_many({_key(user.pk): entry, _attempts_key(user.pk): 0}, ttl)
+
+
+def verify(user, code):
+    """
+    Check `code` for `user`. Returns VERIFIED, INVALID, EXPIRED (no code
+    outstanding) or LOCKED (too many wrong attempts; the code is discarded).
+    """
+    cache = get_cache()
+    entry = cache.get(_key(user.pk))
+    if entry is None or _remaining(entry) <= 0:
+        return EXPIRED
+    try:
+        attempt = cache.incr(_attempts_key(user.pk))
+    except ValueError:
+        # The counter was evicted while the code was not: the code cannot be trusted
+        attempt = settings.OTP_MAX_ATTEMPTS + 1
+    result, discard_code = _check(user, code, entry, attempt)
+    if discard_code:
+        discard(user)
+    return result
+
+
+async def averify(user, code):
+    cache = get_cache()
+    entry = await cache.aget(_key(user.pk))
+    if entry is None or _remaining(entry) <= 0:
+        return EXPIRED
+    try:
+        attempt = await cache.aincr(_attempts_key(user.pk))
+    except ValueError:
+        attempt = settings.OTP_MAX_ATTEMPTS + 1
+    result, discard_code = _check(user, code, entry, attempt)
+    if discard_code:
+        await adiscard(user)
+    return result
+
+
+def discard(user):
+    get_cache().delete_many([_key(user.pk), _attempts_key(user.pk)])
+
+
+async def adiscard(user):
+    await get_cache().adelete_many([_key(user.pk), _attempts_key(user.pk)])
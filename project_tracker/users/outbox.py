@@ -0,0 +1,513 @@
+"""
+Email outbox.
+
+Views call enqueue_email(), which writes an OutboundEmail row and returns.
+drain_outbox() (run by `manage.py run_email_worker`, or in-process when
+EMAIL_OUTBOX_IN_PROCESS is set) claims due rows, sends them concurrently
+through a transport, and records the outcome. HTTP sends happen on worker
+threads; all database writes stay on the calling thread. adrain_outbox()
+(`run_email_worker --async`) does the same with an async HTTP client.
+
+Bulk mail queued with enqueue_emails() (the daily digest) is marked
+`batched` and goes out up to transport.max_batch_size messages per provider
+call through send_batch(); a failed call counts against every message in it.
+Everything else, such as OTP codes, is sent one message per call, and is
+claimed ahead of bulk mail so a digest run does not hold up login codes.
+
+A claim is treated as orphaned after EMAIL_CLAIM_TIMEOUT, so a worker only
+claims as many messages as it can finish within it, even if every send
+exhausts its retries (see claim_size()). Otherwise a slow batch would be
+claimed and sent a second time by another worker.
+"""
+import asyncio
+import logging
+import math
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from requests.adapters import HTTPAdapter
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+BREVO_API_URL = 'https://api.brevo.com/v3/smtp/email'
+# Tries per send, and the longest wait between two of them (seconds)
+SEND_ATTEMPTS = 3
+RETRY_WAIT_MAX = 4
+
+
+class TransientEmailError(Exception):
+    """Delivery failed but may succeed later (timeouts, 429, 5xx)."""
+
+
+class PermanentEmailError(Exception):
+    """The provider rejected the message; retrying will not help."""
+
+
+class BrevoTransport:
+    """Sends through Brevo's HTTP API over one pooled, keep-alive session."""
+
+    def __init__(self, api_key=None, sender_email=None, timeout=None, pool_size=None):
+        self.sender = {'name': 'Project Tracker', 'email': sender_email or settings.DEFAULT_FROM_EMAIL}
+        self.timeout = timeout or settings.EMAIL_HTTP_TIMEOUT
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size or settings.EMAIL_WORKER_CONCURRENCY)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'accept': 'application/json',
+            'api-key': api_key or settings.BREVO_API_KEY or '',
+            'content-type': 'application/json',
+        })
+
+    # Brevo accepts at most this many messageVersions per call
+    max_batch_size = 1000
+
+    def _post(self, data):
+        try:
+            res = self.session.post(BREVO_API_URL, json=data, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise TransientEmailError(str(e))
+        _check_response(res.status_code, res.text)
+
+    def send(self, message):
+        self._post(_single_payload(self.sender, message))
+
+    def send_batch(self, messages):
+        """Send several personalised messages in one API call (messageVersions)."""
+        if messages:
+            self._post(_batch_payload(self.sender, messages, self.max_batch_size))
+
+    def close(self):
+        self.session.close()
+
+
+def _single_payload(sender, message):
+    return {
+        'sender': sender,
+        'to': [{'email': message['to_email'], 'name': message['to_name']}],
+        'subject': message['subject'],
+        'htmlContent': message['html_content'],
+    }
+
+
+def _batch_payload(sender, messages, max_batch_size):
+    if len(messages) > max_batch_size:
+        raise ValueError(f'At most {max_batch_size} messages per batch')
+    return {
+        'sender': sender,
+        'subject': messages[0]['subject'],
+        'htmlContent': messages[0]['html_content'],
+        'messageVersions': [{
+            'to': [{'email': m['to_email'], 'name': m['to_name']}],
+            'subject': m['subject'],
+            'htmlContent': m['html_content'],
+        } for m in messages],
+    }
+
+
+def _check_response(status_code, text):
+    if status_code == 429 or status_code >= 500:
+        raise TransientEmailError(f'Brevo {status_code}: {text[:200]}')
+    if status_code >= 400:
+        raise PermanentEmailError(f'Brevo {status_code}: {text[:200]}')
+
+
+class AsyncBrevoTransport:
+    """
+    Brevo over httpx.AsyncClient, for adrain_outbox(): many sends share one
+    event loop and connection pool instead of a thread each. httpx is
+    imported lazily so the sync path does not need it.
+    """
+    max_batch_size = BrevoTransport.max_batch_size
+
+    def __init__(self, api_key=None, sender_email=None, timeout=None, pool_size=None):
+        import httpx
+        self._httpx = httpx
+        self.sender = {'name': 'Project Tracker', 'email': sender_email or settings.DEFAULT_FROM_EMAIL}
+        self.client = httpx.AsyncClient(
+            timeout=timeout or settings.EMAIL_HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=pool_size or settings.EMAIL_WORKER_CONCURRENCY),
+            headers={
+                'accept': 'application/json',
+                'api-key': api_key or settings.BREVO_API_KEY or '',
+                'content-type': 'application/json',
+            },
+        )
+
+    async def _post(self, data):
+        try:
+            res = await self.client.post(BREVO_API_URL, json=data)
+        except (self._httpx.TransportError, self._httpx.TimeoutException) as e:
+            raise TransientEmailError(str(e))
+        _check_response(res.status_code, res.text)
+
+    async def send(self, message):
+        await self._post(_single_payload(self.sender, message))
+
+    async def send_batch(self, messages):
+        if messages:
+            await self._post(_batch_payload(self.sender, messages, self.max_batch_size))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class FakeTransport:
+    """
+    Local transport that records messages instead of sending them. Set
+    `fail_with` to an exception instance to simulate provider failures.
+    """
+    sent = []
+    # Size of each send_batch() call, so tests can tell batched sends apart
+    batch_sizes = []
+    max_batch_size = 1000
+
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        if self.fail_with is not None:
+            raise self.fail_with
+        with self._lock:
+            FakeTransport.sent.append(dict(message))
+
+    def send_batch(self, messages):
+        if self.fail_with is not None:
+            raise self.fail_with
+        with self._lock:
+            FakeTransport.batch_sizes.append(len(messages))
+            FakeTransport.sent.extend(dict(m) for m in messages)
+
+    def close(self):
+        pass
+
+
+class AsyncFakeTransport(FakeTransport):
+    """FakeTransport with the AsyncBrevoTransport interface."""
+
+    async def send(self, message):
+        FakeTransport.send(self, message)
+
+    async def send_batch(self, messages):
+        FakeTransport.send_batch(self, messages)
+
+    async def aclose(self):
+        pass
+
+
+def get_transport():
+    return import_string(settings.EMAIL_OUTBOX_TRANSPORT)()
+
+
+def get_async_transport():
+    return import_string(settings.EMAIL_OUTBOX_ASYNC_TRANSPORT)()
+
+
+def enqueue_email(to_email, subject, html_content, to_name='', expires_at=None):
+    """Persist an email for background delivery and return the row."""
+    email = OutboundEmail.objects.create(
+        to_email=to_email, to_name=to_name, subject=subject,
+        html_content=html_content, expires_at=expires_at,
+    )
+    if settings.EMAIL_OUTBOX_IN_PROCESS:
+        transaction.on_commit(dispatch_in_process)
+    return email
+
+
+def enqueue_emails(messages, expires_at=None):
+    """
+    Persist several emails in one insert. Messages are dicts with to_email,
+    to_name, subject, html_content and dedupe_key; a message whose
+    dedupe_key is already in the outbox is skipped, so re-running a job
+    does not send twice. Returns the number of emails queued.
+    """
+    keys = [m['dedupe_key'] for m in messages]
+    queued = set(OutboundEmail.objects.filter(dedupe_key__in=keys).values_list('dedupe_key', flat=True))
+    emails = [
+        OutboundEmail(
+            to_email=m['to_email'], to_name=m['to_name'], subject=m['subject'],
+            html_content=m['html_content'], dedupe_key=m['dedupe_key'], expires_at=expires_at, batched=True,
+        )
+        for m in messages if m['dedupe_key'] not in queued
+    ]
+    # ignore_conflicts covers a concurrent run queuing the same key meanwhile
+    OutboundEmail.objects.bulk_create(emails, ignore_conflicts=True)
+    if emails and settings.EMAIL_OUTBOX_IN_PROCESS:
+        transaction.on_commit(dispatch_in_process)
+    return len(emails)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def dispatch_in_process():
+    """Drain the outbox on a single background thread of this process."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='email-outbox')
+    _executor.submit(_drain_in_background)
+
+
+def _drain_in_background():
+    from django.db import close_old_connections
+    try:
+        drain_outbox()
+    except Exception:
+        logger.exception('In-process outbox drain failed')
+    finally:
+        close_old_connections()
+
+
+def send_budget():
+    """Worst-case seconds to deliver one message: every try times out, with the longest waits between."""
+    connect_timeout, read_timeout = settings.EMAIL_HTTP_TIMEOUT
+    return SEND_ATTEMPTS * (connect_timeout + read_timeout) + (SEND_ATTEMPTS - 1) * RETRY_WAIT_MAX
+
+
+def claim_size(batch_size, concurrency):
+    """
+    How many of `batch_size` messages one claim may take so that, sending
+    `concurrency` at a time, all of them finish within EMAIL_CLAIM_TIMEOUT.
+    """
+    rounds = math.floor(settings.EMAIL_CLAIM_TIMEOUT / send_budget())
+    if rounds < 1:
+        raise ImproperlyConfigured(
+            f'EMAIL_CLAIM_TIMEOUT ({settings.EMAIL_CLAIM_TIMEOUT}s) must exceed the {send_budget():.0f}s '
+            'one send can take with retries')
+    return min(batch_size, rounds * concurrency)
+
+
+def bulk_claim_size(transport, concurrency):
+    """Batched messages per claim: one send_batch() call's worth for each concurrent send."""
+    return transport.max_batch_size * concurrency
+
+
+def claim_batch(batch_size, batched=False):
+    """Mark up to batch_size due messages (bulk mail if `batched`) as ours and return them."""
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT)
+    due = (Q(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+           | Q(status=OutboundEmail.STATUS_SENDING, claimed_at__lt=stale)) & Q(batched=batched)
+    uids = list(OutboundEmail.objects.filter(due).order_by('next_attempt_at').values_list('uid', flat=True)[:batch_size])
+    if not uids:
+        return []
+    token = uuid.uuid4()
+    # Re-checking `due` makes the claim safe against a concurrent worker
+    OutboundEmail.objects.filter(due, uid__in=uids).update(
+        status=OutboundEmail.STATUS_SENDING, claim_token=token, claimed_at=now)
+    return list(OutboundEmail.objects.filter(claim_token=token))
+
+
+@retry(retry=retry_if_exception_type(TransientEmailError), stop=stop_after_attempt(SEND_ATTEMPTS),
+       wait=wait_exponential(multiplier=0.5, max=RETRY_WAIT_MAX), reraise=True)
+def _send_with_retry(transport, message):
+    transport.send(message)
+
+
+@retry(retry=retry_if_exception_type(TransientEmailError), stop=stop_after_attempt(SEND_ATTEMPTS),
+       wait=wait_exponential(multiplier=0.5, max=RETRY_WAIT_MAX), reraise=True)
+def _send_batch_with_retry(transport, messages):
+    transport.send_batch(messages)
+
+
+@retry(retry=retry_if_exception_type(TransientEmailError), stop=stop_after_attempt(SEND_ATTEMPTS),
+       wait=wait_exponential(multiplier=0.5, max=RETRY_WAIT_MAX), reraise=True)
+async def _asend_with_retry(transport, message):
+    await transport.send(message)
+
+
+@retry(retry=retry_if_exception_type(TransientEmailError), stop=stop_after_attempt(SEND_ATTEMPTS),
+       wait=wait_exponential(multiplier=0.5, max=RETRY_WAIT_MAX), reraise=True)
+async def _asend_batch_with_retry(transport, messages):
+    await transport.send_batch(messages)
+
+
+def _deliver(transport, message):
+    try:
+        _send_with_retry(transport, message)
+        return None
+    except (TransientEmailError, PermanentEmailError) as e:
+        return e
+    except Exception as e:
+        logger.exception('Unexpected error sending email %s', message['uid'])
+        return TransientEmailError(str(e))
+
+
+def _deliver_batch(transport, messages):
+    try:
+        _send_batch_with_retry(transport, messages)
+        return None
+    except (TransientEmailError, PermanentEmailError) as e:
+        return e
+    except Exception as e:
+        logger.exception('Unexpected error sending a batch of %d emails', len(messages))
+        return TransientEmailError(str(e))
+
+
+def _record(email, error, now):
+    email.attempts += 1
+    email.updated_at = now
+    email.claim_token = None
+    email.claimed_at = None
+    if error is None:
+        email.status = OutboundEmail.STATUS_SENT
+        email.sent_at = now
+        email.last_error = ''
+    else:
+        email.last_error = str(error)[:1000]
+        retryable = isinstance(error, TransientEmailError) and email.attempts < settings.EMAIL_MAX_ATTEMPTS
+        if retryable:
+            email.status = OutboundEmail.STATUS_PENDING
+            email.next_attempt_at = now + timedelta(seconds=30 * 2 ** (email.attempts - 1))
+        else:
+            email.status = OutboundEmail.STATUS_FAILED
+            logger.error('Giving up on email %s to %s: %s', email.uid, email.to_email, error)
+
+
+async def _adeliver(transport, message, limit):
+    async with limit:
+        try:
+            await _asend_with_retry(transport, message)
+            return None
+        except (TransientEmailError, PermanentEmailError) as e:
+            return e
+        except Exception as e:
+            logger.exception('Unexpected error sending email %s', message['uid'])
+            return TransientEmailError(str(e))
+
+
+async def _adeliver_batch(transport, messages, limit):
+    async with limit:
+        try:
+            await _asend_batch_with_retry(transport, messages)
+            return None
+        except (TransientEmailError, PermanentEmailError) as e:
+            return e
+        except Exception as e:
+            logger.exception('Unexpected error sending a batch of %d emails', len(messages))
+            return TransientEmailError(str(e))
+
+
+def _split_expired(batch):
+    now = timezone.now()
+    live, expired = [], []
+    for email in batch:
+        (expired if email.expires_at and email.expires_at <= now else live).append(email)
+    return live, expired
+
+
+def _split_batched(emails, max_batch_size):
+    """(emails sent one per call, [lists of batched emails sent together])."""
+    single = [e for e in emails if not e.batched]
+    batched = [e for e in emails if e.batched]
+    return single, [batched[i:i + max_batch_size] for i in range(0, len(batched), max_batch_size)]
+
+
+def _spread(chunks, chunk_errors):
+    """One error per email, from the outcome of the call its chunk went out in."""
+    return [error for chunk, error in zip(chunks, chunk_errors) for _ in chunk]
+
+
+def _messages(emails):
+    return [{'uid': e.uid, 'to_email': e.to_email, 'to_name': e.to_name,
+             'subject': e.subject, 'html_content': e.html_content} for e in emails]
+
+
+def _record_batch(batch, live, errors, expired):
+    """Apply send outcomes to a claimed batch and save it; returns (sent, failed)."""
+    now = timezone.now()
+    sent = failed = 0
+    for email, error in zip(live, errors):
+        _record(email, error, now)
+        if error is None:
+            sent += 1
+        else:
+            failed += 1
+    for email in expired:
+        _record(email, PermanentEmailError('Expired before delivery'), now)
+        failed += 1
+    OutboundEmail.objects.bulk_update(
+        batch, ['status', 'attempts', 'last_error', 'next_attempt_at',
+                'claim_token', 'claimed_at', 'sent_at', 'updated_at'])
+    return sent, failed
+
+
+def drain_outbox(transport=None, batch_size=50, concurrency=None):
+    """
+    Send every due message, individual ones before bulk mail. Returns
+    (sent, failed) counts for this run, where failed includes messages
+    rescheduled for a later retry.
+    """
+    owns_transport = transport is None
+    transport = transport or get_transport()
+    concurrency = concurrency or settings.EMAIL_WORKER_CONCURRENCY
+    batch_size = claim_size(batch_size, concurrency)
+    bulk_size = bulk_claim_size(transport, concurrency)
+    sent = failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='email-send') as pool:
+            while True:
+                batch = claim_batch(batch_size) or claim_batch(bulk_size, batched=True)
+                if not batch:
+                    break
+                live, expired = _split_expired(batch)
+                single, chunks = _split_batched(live, transport.max_batch_size)
+                single_errors = pool.map(lambda m: _deliver(transport, m), _messages(single))
+                chunk_errors = pool.map(lambda c: _deliver_batch(transport, _messages(c)), chunks)
+                errors = list(single_errors) + _spread(chunks, list(chunk_errors))
+                live = single + [email for chunk in chunks for email in chunk]
+                batch_sent, batch_failed = _record_batch(batch, live, errors, expired)
+                sent += batch_sent
+                failed += batch_failed
+    finally:
+        if owns_transport:
+            transport.close()
+    return sent, failed
+
+
+async def adrain_outbox(transport=None, batch_size=50, concurrency=None):
+    """
+    drain_outbox() on an event loop: sends go through an async transport
+    (EMAIL_OUTBOX_ASYNC_TRANSPORT) with at most `concurrency` in flight, and
+    the claim/record queries run on Django's sync thread.
+    """
+    owns_transport = transport is None
+    transport = transport or get_async_transport()
+    concurrency = concurrency or settings.EMAIL_WORKER_CONCURRENCY
+    batch_size = claim_size(batch_size, concurrency)
+    bulk_size = bulk_claim_size(transport, concurrency)
+    limit = asyncio.Semaphore(concurrency)
+    sent = failed = 0
+    try:
+        while True:
+            batch = (await sync_to_async(claim_batch)(batch_size)
+                     or await sync_to_async(claim_batch)(bulk_size, batched=True))
+            if not batch:
+                break
+            live, expired = _split_expired(batch)
+            single, chunks = _split_batched(live, transport.max_batch_size)
+            errors = await asyncio.gather(
+                *(_adeliver(transport, m, limit) for m in _messages(single)),
+                *(_adeliver_batch(transport, _messages(c), limit) for c in chunks))
+            errors = list(errors[:len(single)]) + _spread(chunks, errors[len(single):])
+            live = single + [email for chunk in chunks for email in chunk]
+            batch_sent, batch_failed = await sync_to_async(_record_batch)(batch, live, errors, expired)
+            sent += batch_sent
+            failed += batch_failed
+    finally:
+        if owns_transport:
+            await transport.aclose()
+    return sent, failed
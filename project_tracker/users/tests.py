@@ -1,3 +1,224 @@
-from django.test import TestCase
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from . import otp
+from .backends import CachedModelBackend, invalidate_user
+from .models import OutboundEmail, User
+from .outbox import (
+    AsyncFakeTransport, FakeTransport, PermanentEmailError, TransientEmailError,
+    adrain_outbox, claim_batch, claim_size, drain_outbox, enqueue_email, enqueue_emails, send_budget,
+)
 
-# Create your tests here.
+
+def message(to_email='a@example.com'):
+    return {'uid': None, 'to_email': to_email, 'to_name': '', 'subject': 'Hi', 'html_content': '<p>Hi</p>'}
+
+
+@override_settings(EMAIL_OUTBOX_IN_PROCESS=False)
+class OutboxTests(TestCase):
+
+    def setUp(self):
+        FakeTransport.sent.clear()
+        FakeTransport.batch_sizes.clear()
+
+    def enqueue(self, count=1, **kwargs):
+        return [enqueue_email(f'user{i}@example.com', 'Code', '<p>123456</p>', **kwargs) for i in range(count)]
+
+    def enqueue_bulk(self, count):
+        return enqueue_emails([
+            {'to_email': f'bulk{i}@example.com', 'to_name': '', 'subject': 'Digest',
+             'html_content': '<p>Digest</p>', 'dedupe_key': f'bulk:{i}'}
+            for i in range(count)
+        ])
+
+    def test_drain_sends_and_marks_sent(self):
+        emails = self.enqueue(3)
+        self.assertEqual(drain_outbox(FakeTransport()), (3, 0))
+        self.assertEqual(sorted(m['to_email'] for m in FakeTransport.sent), sorted(e.to_email for e in emails))
+        for email in OutboundEmail.objects.all():
+            self.assertEqual(email.status, OutboundEmail.STATUS_SENT)
+            self.assertEqual(email.attempts, 1)
+            self.assertIsNone(email.claim_token)
+        # Nothing is due any more
+        self.assertEqual(drain_outbox(FakeTransport()), (0, 0))
+
+    def test_transient_failure_is_rescheduled(self):
+        email, = self.enqueue()
+        self.assertEqual(drain_outbox(FakeTransport(fail_with=TransientEmailError('503'))), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+    def test_permanent_failure_gives_up(self):
+        email, = self.enqueue()
+        drain_outbox(FakeTransport(fail_with=PermanentEmailError('400')))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_FAILED)
+
+    def test_expired_message_is_not_sent(self):
+        email, = self.enqueue(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(drain_outbox(FakeTransport()), (0, 1))
+        self.assertEqual(FakeTransport.sent, [])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_FAILED)
+
+    def test_live_claim_is_not_reclaimed(self):
+        self.enqueue(2)
+        self.assertEqual(len(claim_batch(10)), 2)
+        self.assertEqual(claim_batch(10), [])
+
+    def test_stale_claim_is_reclaimed(self):
+        self.enqueue()
+        claim_batch(10)
+        OutboundEmail.objects.update(claimed_at=timezone.now() - timedelta(seconds=3600))
+        self.assertEqual(len(claim_batch(10)), 1)
+
+    @override_settings(EMAIL_HTTP_TIMEOUT=(3.05, 10), EMAIL_CLAIM_TIMEOUT=120)
+    def test_claim_fits_in_claim_timeout(self):
+        size = claim_size(50, 4)
+        self.assertLess(size, 50)
+        self.assertLessEqual(-(-size // 4) * send_budget(), 120)
+
+    @override_settings(EMAIL_HTTP_TIMEOUT=(3.05, 10), EMAIL_CLAIM_TIMEOUT=30)
+    def test_claim_timeout_shorter_than_one_send_is_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            drain_outbox(FakeTransport())
+
+    @override_settings(EMAIL_HTTP_TIMEOUT=(3.05, 10), EMAIL_CLAIM_TIMEOUT=120)
+    def test_drain_claims_in_batches_that_fit(self):
+        self.enqueue(20)
+        self.assertEqual(drain_outbox(FakeTransport(), batch_size=50, concurrency=4), (20, 0))
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.STATUS_SENT).count(), 20)
+
+    def test_bulk_mail_is_sent_in_batches(self):
+        self.enqueue_bulk(25)
+        self.enqueue(2)
+        transport = FakeTransport()
+        transport.max_batch_size = 10
+        self.assertEqual(drain_outbox(transport, concurrency=4), (27, 0))
+        self.assertEqual(sorted(FakeTransport.batch_sizes), [5, 10, 10])
+        # Individual messages are sent first, one per call
+        self.assertEqual([m['to_email'] for m in FakeTransport.sent[:2]], ['user0@example.com', 'user1@example.com'])
+
+    def test_failed_batch_reschedules_every_message(self):
+        self.enqueue_bulk(3)
+        self.assertEqual(drain_outbox(FakeTransport(fail_with=TransientEmailError('503'))), (0, 3))
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'attempts')), {(OutboundEmail.STATUS_PENDING, 1)})
+
+    def test_async_drain(self):
+        self.enqueue(3)
+        self.assertEqual(async_to_sync(adrain_outbox)(AsyncFakeTransport()), (3, 0))
+        self.assertEqual(len(FakeTransport.sent), 3)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.STATUS_SENT).exists())
+
+    def test_async_drain_sends_bulk_mail_in_batches(self):
+        self.enqueue_bulk(3)
+        self.assertEqual(async_to_sync(adrain_outbox)(AsyncFakeTransport()), (3, 0))
+        self.assertEqual(FakeTransport.batch_sizes, [3])
+
+    def test_async_fake_transport_send_batch(self):
+        async_to_sync(AsyncFakeTransport().send_batch)([message('a@example.com'), message('b@example.com')])
+        self.assertEqual([m['to_email'] for m in FakeTransport.sent], ['a@example.com', 'b@example.com'])
+
+
+class SessionTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('session@example.com')
+        self.client.force_login(self.user)
+        # A second browser tab, or the next request landing on another worker
+        self.other = Client()
+        self.other.cookies[settings.SESSION_COOKIE_NAME] = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    def test_warm_request_reads_no_session_or_user_rows(self):
+        self.user.is_staff = True
+        self.user.save()
+        url = reverse('dashboard_cache_stats')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_shared_session_is_served(self):
+        self.assertEqual(self.other.get(reverse('index')).status_code, 200)
+
+    def test_logout_invalidates_session(self):
+        self.client.get(reverse('users:logout'))
+        response = self.other.get(reverse('index'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('login', response.url)
+
+    def test_deactivation_ends_session(self):
+        self.other.get(reverse('index'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.other.get(reverse('index')).status_code, 302)
+
+    def test_async_user_lookup_uses_the_cache(self):
+        backend = CachedModelBackend()
+        invalidate_user(self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(async_to_sync(backend.aget_user)(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(async_to_sync(backend.aget_user)(self.user.pk), self.user)
+            # Both paths share one entry
+            self.assertEqual(backend.get_user(self.user.pk), self.user)
+
+    def test_session_cache_is_shared_between_processes(self):
+        if settings.SESSION_ENGINE.endswith('cached_db') or settings.SESSION_ENGINE.endswith('.cache'):
+            self.assertNotIsInstance(caches[settings.SESSION_CACHE_ALIAS], LocMemCache)
+        if 'users.backends.CachedModelBackend' in settings.AUTHENTICATION_BACKENDS:
+            self.assertNotIsInstance(caches[settings.AUTH_USER_CACHE_ALIAS], LocMemCache)
+
+
+class OtpLoginTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('otp@example.com')
+
+    def submit(self, code):
+        session = self.client.session
+        session['otp_email'] = self.user.email
+        session.save()
+        return self.client.post(reverse('users:verify_otp'), {'otp_code': code})
+
+    def test_correct_code_logs_in(self):
+        self.user.set_otp('123456')
+        self.assertRedirects(self.submit('123456'), reverse('index'), fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse('index')).status_code, 200)
+
+    @override_settings(AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.ModelBackend'])
+    def test_login_without_cached_backend(self):
+        # AUTH_CACHE_BACKEND=locmem leaves CachedModelBackend out
+        self.user.set_otp('123456')
+        self.submit('123456')
+        self.assertEqual(self.client.get(reverse('index')).status_code, 200)
+
+    def test_wrong_codes_lock_out(self):
+        self.user.set_otp('123456')
+        for _ in range(settings.OTP_MAX_ATTEMPTS - 1):
+            self.assertEqual(self.user.verify_otp('000000'), otp.INVALID)
+        self.assertEqual(self.user.verify_otp('000000'), otp.LOCKED)
+        # The code is gone, so the right one no longer works either
+        self.assertEqual(self.user.verify_otp('123456'), otp.EXPIRED)
+        self.submit('123456')
+        self.assertEqual(self.client.get(reverse('index')).status_code, 302)
+
+    def test_new_code_resets_attempts(self):
+        self.user.set_otp('123456')
+        for _ in range(settings.OTP_MAX_ATTEMPTS - 1):
+            self.user.verify_otp('000000')
+        self.user.set_otp('654321')
+        self.assertEqual(self.user.verify_otp('000000'), otp.INVALID)
+        self.assertEqual(self.user.verify_otp('654321'), otp.VERIFIED)
+
+    def test_lost_attempt_counter_locks(self):
+        self.user.set_otp('123456')
+        otp.get_cache().delete(otp._attempts_key(self.user.pk))
+        self.assertEqual(self.user.verify_otp('123456'), otp.LOCKED)
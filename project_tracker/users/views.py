@@ -1,14 +1,18 @@
 from django.shortcuts import render, redirect
-from django.contrib.auth import authenticate, login, logout
+from asgiref.sync import sync_to_async
+from django.contrib.auth import alogin, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.http import JsonResponse
 from django.core.mail import send_mail
 from django.conf import settings
+from django.utils import timezone
 from .models import User
+from . import otp
+from .outbox import enqueue_email
+from datetime import timedelta
 import random
 import string
-import requests
 
 
 def generate_otp(length=6):
@@ -17,30 +21,19 @@ def generate_otp(length=6):
 
 
 def send_otp_email(user, otp_code):
-    """Send OTP to user's email."""
-    url = "https://api.brevo.com/v3/smtp/email"
-    headers = {
-        "accept": "application/json",
-        "api-key": settings.BREVO_API_KEY,
-        "content-type": "application/json",
-    }
-    data = {    
-        "sender": {"name": "Project Tracker", "email": settings.DEFAULT_FROM_EMAIL},
-        "to": [{"email": user.email, "name": f"{user.first_name} {user.last_name}"}],
-        "subject": "Your OTP Code",
-        "htmlContent": f"<html><body><p>Use the below OTP Code to log in to the Scorecard tracker. <br> <br> Your OTP code is: <strong>{otp_code}</strong></p><p>This code will expire in 10 minutes.</p></body></html>",
-    }
-    try:
-        res = requests.post(url, json=data, headers=headers)
-        print(f"Brevo response: {res.status_code} - {res.text}")
-        return True
-    except Exception as e:
-        print(f"Failed to send OTP email: {e}")
-        return False
+    """Queue the OTP email for the outbox worker; returns without calling the provider."""
+    validity = settings.OTP_VALIDITY_MINUTES
+    enqueue_email(
+        to_email=user.email,
+        to_name=f"{user.first_name} {user.last_name}",
+        subject="Your OTP Code",
+        html_content=f"<html><body><p>Use the below OTP Code to log in to the Scorecard tracker. <br> <br> Your OTP code is: <strong>{otp_code}</strong></p><p>This code will expire in {validity} minutes.</p></body></html>",
+        expires_at=timezone.now() + timedelta(minutes=validity),
+    )
 
 
 @require_http_methods(["GET", "POST"])
-def request_otp(request):
+async def request_otp(request):
     """Request an OTP to be sent to the user's email."""
     if request.method == 'GET':
         return render(request, 'users/request_otp.html')
@@ -50,32 +43,30 @@ def request_otp(request):
         return render(request, 'users/request_otp.html', {'error': 'Email is required.'})
     
     try:
-        user = User.objects.get(email=email)
+        user = await User.objects.aget(email=email)
     except User.DoesNotExist:
         # For security, don't reveal if user exists
         # return render(request, 'users/request_otp.html', 
         return redirect('users:verify_otp')
                     #  {'message': 'If the email exists, an OTP has been sent.'})
     
-    # Generate and send OTP
+    # Generate and queue OTP
     otp_code = generate_otp()
-    user.set_otp(otp_code)
-    
-    if send_otp_email(user, otp_code):
-        request.session['otp_email'] = email
-        return redirect('users:verify_otp')
-    else:
-        return render(request, 'users/request_otp.html', 
-                     {'error': 'Failed to send OTP. Please try again.'})
+    await user.aset_otp(otp_code, settings.OTP_VALIDITY_MINUTES)
+    # enqueue_email relies on transaction.on_commit, so it runs on the sync side
+    await sync_to_async(send_otp_email)(user, otp_code)
+
+    await request.session.aset('otp_email', email)
+    return redirect('users:verify_otp')
 
 
 @require_http_methods(["GET", "POST"])
-def verify_otp(request):
+async def verify_otp(request):
     """Verify the OTP code entered by the user."""
     if request.method == 'GET':
         return render(request, 'users/verify_otp.html')
     
-    email = request.session.get('otp_email')
+    email = await request.session.aget('otp_email')
     otp_code = request.POST.get('otp_code')
     
     if not email or not otp_code:
@@ -83,29 +74,28 @@ def verify_otp(request):
                      {'error': 'Email and OTP code are required.'})
     
     try:
-        user = User.objects.get(email=email)
+        user = await User.objects.aget(email=email)
     except User.DoesNotExist:
         return render(request, 'users/verify_otp.html', 
                      {'error': 'User not found.'})
     
-    # Verify OTP
-    if user.otp_code != otp_code:
+    # Verify OTP (one cache read, at most one cache write; the user row is untouched)
+    result = await user.averify_otp(otp_code)
+    if result == otp.INVALID:
         return render(request, 'users/verify_otp.html', 
                      {'error': 'Invalid OTP code.'})
     
-    if not user.is_otp_valid():
+    if result == otp.EXPIRED:
         return render(request, 'users/verify_otp.html', 
                      {'error': 'OTP has expired. Please request a new one.'})
+
+    if result == otp.LOCKED:
+        return render(request, 'users/verify_otp.html', 
+                     {'error': 'Too many incorrect attempts. Please request a new OTP.'})
     
-    # OTP verified successfully
-    user.is_otp_verified = True
-    user.otp_code = None
-    user.otp_expiry = None
-    user.save()
-    
-    # Log the user in
-    login(request, user, backend='django.contrib.auth.backends.ModelBackend')
-    request.session.pop('otp_email', None)
+    # Log the user in (login() only writes last_login, via update_fields)
+    await alogin(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
+    await request.session.apop('otp_email', None)
     
     return redirect('index')  # or your home page
 